@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
-import time, uuid, threading, re, pytz, os, statistics, sys
+import time, threading, pytz, sys
 from pathlib import Path
 from datetime import datetime
 from typing import Optional
@@ -14,7 +14,15 @@ log_file.parent.mkdir(parents=True, exist_ok=True)
 
 # ===== QuickFIX =====
 import quickfix as fix
-import quickfix50sp2 as fix50sp2
+
+from order_scheduler import OpenLoopScheduler
+from hdr_histogram import LogLinearHistogram
+from correlation_table import CorrelationTable, NO_TAG
+from async_writer import BatchedWriter
+from order_templates import NosTemplateBook
+from clordid_gen import ClOrdIdGen
+from inflight_window import InFlightWindow
+from token_bucket import TokenBucket
 
 
 # ===== Config knobs =====
@@ -36,88 +44,515 @@ QTY            = 1
 maxloop        = 400
 PRICE          = 0.50
 incr           = 0.00
+TARGET_QPS     = 100     # YES+NO pairs per second (open-loop, see order_scheduler.py)
 SUMMARY_EVERY  = 50      # print a stats line every N ExecReports captured
+CORR_CAPACITY  = 65536   # max orders awaiting a first ER (fixed memory)
+ER_TIMEOUT_S   = 30.0    # no ER within this long -> counted as "no response"
+CLSEQ_FILE     = data_dir / "clseq.dat"   # ClOrdID counter, reserved in blocks (clordid_gen.py)
+MAX_IN_FLIGHT  = 0       # max orders sent without an ER yet; 0 = no limit (argv[2] overrides)
+WINDOW_POLICY  = "block" # window full: "block" until an ER frees a slot, or "skip" the order
+VENUE_MSG_RATE = 0       # app messages/sec the venue allows on this session; 0 = no throttle
+VENUE_BURST    = 1       # messages allowed back-to-back before the rate applies
+WARMUP_ORDERS  = 0       # first N orders are warm-up: sent, but kept out of the headline stats
+WARMUP_S       = 0.0     # ...and/or everything sent in the first N seconds (both: whichever ends later)
 
 # ===== Latency tracker =====
 class LatencyTracker:
-    """Correlates ClOrdID -> send time; captures first ER latency per order."""
-    def __init__(self, csv_path: Path):
-        self._send_ns = {}           # clordid -> ns at send
-        self._done    = set()        # clordids already recorded
+    """Correlates ClOrdID -> send time; captures first ER latency per order.
+
+    Two latencies are kept per order:
+      raw       = first ER - actual send (toApp)
+      corrected = first ER - intended send (the scheduler's planned time)
+    If the sender stalls, orders queued behind the stall go out late and the raw
+    number hides that wait; the corrected number charges it to the order, which is
+    what HdrHistogram's corrected recording is for (coordinated omission).
+    Orders sent without an intended time count the same in both.
+
+    Send times live in a fixed-size CorrelationTable keyed by the integer counter
+    of our ClOrdIDs (ClOrdIdGen: run prefix + counter); an order leaves it on its
+    first ER or after ER_TIMEOUT_S. If a window (InFlightWindow) is attached, its
+    slot is given back whenever an order leaves the table.
+
+    Orders can carry a tag (see add_tag / order_mix.py); tagged orders also get
+    their own histograms so the report can break latency down per combination.
+
+    With enable_fills() a second table keeps each order until its first fill
+    (ExecType=F), so order-to-fill latency is reported next to ack latency
+    (fill_line, and per tag in tag_lines). Orders that never fill time out of it
+    as "unfilled"; rejects and cancels leave it straight away.
+
+    With a warm-up (warmup_orders and/or warmup_s, counted from the first send)
+    the orders sent during it still go out and still get correlated, but their
+    latency lands in separate histograms (warmup_line) instead of the headline,
+    interval and per-tag ones: cold caches and lazy imports stay out of p99.
+    """
+    def __init__(self, csv_path: Path, clordid_prefix: str,
+                 capacity: int = CORR_CAPACITY, timeout_s: float = ER_TIMEOUT_S,
+                 warmup_orders: int = WARMUP_ORDERS, warmup_s: float = WARMUP_S):
+        self._prefix  = clordid_prefix
+        self._table   = CorrelationTable(capacity, timeout_s)   # seq -> send / intended ns
+        self._done_n  = 0            # orders with a recorded first ER
         self._lock    = threading.Lock()
-        self._lat_ms  = []           # list of float (milliseconds)
+        self._hist_raw = LogLinearHistogram()   # microseconds, raw
+        self._hist_cor = LogLinearHistogram()   # microseconds, corrected
+        self._ivl_raw  = LogLinearHistogram()   # same, since the last interval_summary()
+        self._ivl_cor  = LogLinearHistogram()
+        self._ivl_no_response0 = 0
+        self._rejects  = 0           # orders whose first ER was ExecType=8 (Rejected)
+        self._ivl_rejects = 0
         self._count_reported = 0
+        self._tags = []              # tag index -> {"name", "sent", "raw", "corrected", "rejects"}
+        self.warmup_orders = warmup_orders
+        self.warmup_s = warmup_s
+        self._warming  = warmup_orders > 0 or warmup_s > 0
+        self._warm_t0  = None        # first send, ns
+        self._warm_n   = 0           # orders sent during warm-up
+        self._warm_hi  = -1          # highest warm-up key; keys are handed out in send order
+        self._warm_raw = LogLinearHistogram()
+        self._warm_cor = LogLinearHistogram()
+        self._warm_rejects = 0
+        self._fills    = None        # CorrelationTable of orders awaiting a first fill (enable_fills)
+        self._fill_raw = LogLinearHistogram()
+        self._fill_cor = LogLinearHistogram()
+        self.window: Optional[InFlightWindow] = None
         self.csv_path = csv_path
         if not self.csv_path.exists():
             # header
-            self.csv_path.write_text("utc_ts,clordid,orderid,exectype,ordstatus,latency_ms,price,qty,symbol\n", encoding="utf-8")
+            self.csv_path.write_text("utc_ts,clordid,orderid,exectype,ordstatus,latency_ms,price,qty,symbol,corrected_ms\n", encoding="utf-8")
+        self._csv = BatchedWriter(self.csv_path)   # rows are written off the ER path
+
+    def close(self):
+        """Flushes pending CSV rows; call once on shutdown."""
+        self._csv.close()
+        print(self._csv.summary_line())
 
     @staticmethod
     def _now_ns():
         # monotonic/steady clock for deltas
         return time.perf_counter_ns()
 
-    def note_send(self, clordid: str):
+    def _key(self, clordid: str) -> Optional[int]:
+        # ClOrdIDs we didn't generate this run (other runs, manual cancels) have no key
+        if not clordid.startswith(self._prefix):
+            return None
+        try:
+            return int(clordid[len(self._prefix):])
+        except ValueError:
+            return None
+
+    def add_tag(self, name: str) -> int:
+        """Registers a per-combination tag; returns the index to pass to note_intended."""
         with self._lock:
-            self._send_ns[clordid] = self._now_ns()
-    
-    
+            self._tags.append({"name": name, "sent": 0, "raw": LogLinearHistogram(),
+                               "corrected": LogLinearHistogram(), "rejects": 0,
+                               "fill_raw": LogLinearHistogram(), "fill_cor": LogLinearHistogram()})
+            return len(self._tags) - 1
 
-    def note_exec_report(self, clordid: str, orderid: str, exectype: str, ordstatus: str,
-                     price: Optional[float], qty: Optional[float], symbol: Optional[str]):
-        """Call on *any* ER. We record latency on first ER per clordid."""
+    def enable_fills(self):
+        """Also measure send -> first fill (ExecType=F) per order; call before the first send."""
         with self._lock:
-            if clordid in self._done:
+            if self._fills is None:
+                t = self._table
+                self._fills = CorrelationTable(t.capacity, t.timeout_ns / 1e9)
+
+    def note_intended(self, clordid: str, intended_ns: Optional[int], tag: int = NO_TAG):
+        """Call before sending with the scheduler's planned send time (perf_counter_ns)."""
+        if intended_ns is None:
+            if tag == NO_TAG:
                 return
+            # the tag needs a table entry before toApp; no plan means "intended = now"
+            intended_ns = self._now_ns()
+        key = self._key(clordid)
+        if key is None:
+            return
+        with self._lock:
+            before = self._table.no_response
+            self._table.set_intended(key, intended_ns, tag)
+            if self._fills is not None:
+                self._fills.set_intended(key, intended_ns, tag)
+            if tag != NO_TAG:
+                self._tags[tag]["sent"] += 1
+            evicted = self._table.no_response - before
+        self._release(evicted)
 
+    def note_send(self, clordid: str):
+        key = self._key(clordid)
+        if key is None:
+            return
+        with self._lock:
+            before = self._table.no_response
+            now_ns = self._now_ns()
+            if self._warming:
+                self._note_warmup(key, now_ns)
+            self._table.expire(now_ns)
+            self._table.set_sent(key, now_ns)
+            if self._fills is not None:
+                self._fills.expire(now_ns)
+                self._fills.set_sent(key, now_ns)
+            evicted = self._table.no_response - before
+        self._release(evicted)
+
+    def _note_warmup(self, key: int, now_ns: int):
+        # called with self._lock held, once per send until the warm-up is over
+        if self._warm_t0 is None:
+            self._warm_t0 = now_ns
+        if self._warm_n < self.warmup_orders or now_ns - self._warm_t0 < self.warmup_s * 1e9:
+            self._warm_n += 1
+            if key > self._warm_hi:
+                self._warm_hi = key
+        else:
+            self._warming = False
+            print(f"[WARMUP] done after {self._warm_n} orders / {(now_ns - self._warm_t0) / 1e9:.3f}s; measuring")
+
+    def discard(self, clordid: str) -> bool:
+        """Forget an order that never went out (sendToTarget failed).
+
+        True if it had a table entry, whose window slot is then handed back; an
+        order with no planned time and no toApp never got one, so the caller
+        still holds that slot.
+        """
+        key = self._key(clordid)
+        if key is None:
+            return False
+        with self._lock:
+            entry = self._table.pop(key)
+        if entry is not None:
+            self._release(1)
+            return True
+        return False
+
+    def expire(self):
+        """Times out orders past ER_TIMEOUT_S now (also runs on every send)."""
+        with self._lock:
+            evicted = self._table.expire(self._now_ns())
+        self._release(evicted)
+
+    def _release(self, n: int):
+        # called without self._lock held; the window has its own lock
+        if n and self.window is not None:
+            self.window.release(n)
+
+    def note_exec_report(self, clordid: str, orderid: str, exectype: str, ordstatus: str,
+                     price: Optional[float], qty: Optional[float], symbol: Optional[str],
+                     rejected: bool = False):
+        """Call on *any* ER. We record latency on first ER per clordid.
+
+        rejected=True marks a response that is a reject without being 8/8
+        (an OrderCancelReject, 35=9, to one of our F/G requests).
+        """
+        key = self._key(clordid)
+        if key is None:
+            return
+        with self._lock:
+            if self._fills is not None:
+                self._note_fill(key, exectype, rejected)
             # We prefer to capture on PendingNew ('A') or New ('0'). If other types arrive first, we still record.
-            if clordid not in self._send_ns:
-                # We missed the send (e.g., restarted mid-stream). Ignore gracefully.
+            # Later ERs for the same order, timed-out orders and sends we never saw all miss the table.
+            tag = self._table.tag(key)
+            entry = self._table.pop(key)
+            if entry is None:
                 return
 
-            sent_ns = self._send_ns[clordid]
-            delta_ms = (self._now_ns() - sent_ns) / 1_000_000.0
-            self._lat_ms.append(delta_ms)
-            self._done.add(clordid)
+            now_ns = self._now_ns()
+            sent_ns, intended_ns = entry
+            # intended time can't be after the actual send; clamp in case of clock jitter
+            start_ns = min(intended_ns or sent_ns, sent_ns)
+            delta_ms = (now_ns - sent_ns) / 1_000_000.0
+            corrected_ms = (now_ns - start_ns) / 1_000_000.0
+            raw_us, cor_us = (now_ns - sent_ns) // 1000, (now_ns - start_ns) // 1000
+            rejected = rejected or exectype == "8"
+            warmup = key <= self._warm_hi
+            if warmup:
+                self._warm_raw.record(raw_us)
+                self._warm_cor.record(cor_us)
+                if rejected:
+                    self._warm_rejects += 1
+            else:
+                self._hist_raw.record(raw_us)
+                self._hist_cor.record(cor_us)
+                self._ivl_raw.record(raw_us)
+                self._ivl_cor.record(cor_us)
+                if rejected:
+                    self._rejects += 1
+                    self._ivl_rejects += 1
+                if tag != NO_TAG:
+                    t = self._tags[tag]
+                    t["raw"].record(raw_us)
+                    t["corrected"].record(cor_us)
+                    if rejected:
+                        t["rejects"] += 1
+                self._done_n += 1
 
             # Append CSV row
             utc_iso = datetime.now(pytz.UTC).isoformat()
-            row = f"{utc_iso},{clordid},{orderid},{exectype},{ordstatus},{delta_ms:.3f},{price if price is not None else ''},{qty if qty is not None else ''},{symbol or ''}\n"
-            with self.csv_path.open("a", encoding="utf-8") as f:
-                f.write(row)
+            row = f"{utc_iso},{clordid},{orderid},{exectype},{ordstatus},{delta_ms:.3f},{price if price is not None else ''},{qty if qty is not None else ''},{symbol or ''},{corrected_ms:.3f}"
+            self._csv.write(row)
+
+            # periodic summary (built under the lock, printed after it is released)
+            stats_line = None
+            if not warmup and self._done_n // SUMMARY_EVERY > self._count_reported // SUMMARY_EVERY:
+                self._count_reported = self._done_n
+                stats_line = self.format_line(self._summary_locked(), prefix="[STATS]")
+        self._release(1)     # the order's window slot
+        if stats_line:
+            print(stats_line)
+
+    def _note_fill(self, key: int, exectype: str, rejected: bool):
+        # called with self._lock held, for every ER of one of our orders
+        if exectype == "F":
+            tag = self._fills.tag(key)
+            entry = self._fills.pop(key)
+            if entry is None or key <= self._warm_hi:
+                return
+            now_ns = self._now_ns()
+            sent_ns, intended_ns = entry
+            start_ns = min(intended_ns or sent_ns, sent_ns)
+            raw_us, cor_us = (now_ns - sent_ns) // 1000, (now_ns - start_ns) // 1000
+            self._fill_raw.record(raw_us)
+            self._fill_cor.record(cor_us)
+            if tag != NO_TAG:
+                self._tags[tag]["fill_raw"].record(raw_us)
+                self._tags[tag]["fill_cor"].record(cor_us)
+        elif rejected or exectype in ("4", "8", "C"):
+            self._fills.pop(key)         # canceled / rejected / expired: no fill coming
 
-            # periodic summary
-            if len(self._done) // SUMMARY_EVERY > self._count_reported // SUMMARY_EVERY:
-                self._count_reported = len(self._done)
-                print(self.summary_line(prefix="[STATS]"))
+    @staticmethod
+    def _stats(h: LogLinearHistogram):
+        # histogram is in microseconds; report in milliseconds like before
+        p = h.percentiles((50, 90, 99))
+        return {"n": h.total_count, "mean": h.mean / 1000.0,
+                "p50": p[50] / 1000.0, "p90": p[90] / 1000.0, "p99": p[99] / 1000.0,
+                "max": h.max / 1000.0}
+
+    @classmethod
+    def _summarize(cls, raw, cor, no_response, pending, rejects=0):
+        if raw.total_count == 0:
+            return {"n": 0, "no_response": no_response, "pending": pending, "rejects": rejects}
+        s = cls._stats(raw)
+        s["corrected"] = cls._stats(cor)
+        s["no_response"] = no_response
+        s["pending"] = pending
+        s["rejects"] = rejects
+        return s
+
+    def _summary_locked(self):
+        # no expire() here: it would have to release window slots under our lock
+        t = self._table
+        return self._summarize(self._hist_raw, self._hist_cor, t.no_response, t.live, self._rejects)
+
+    def interval_summary(self):
+        """summary()-shaped dict for ERs since the previous call; then starts a new interval."""
+        self.expire()
+        with self._lock:
+            t = self._table
+            s = self._summarize(self._ivl_raw, self._ivl_cor,
+                                t.no_response - self._ivl_no_response0, t.live, self._ivl_rejects)
+            self._ivl_raw.reset()
+            self._ivl_cor.reset()
+            self._ivl_no_response0 = t.no_response
+            self._ivl_rejects = 0
+        return s
+
+    def export(self):
+        """Histograms + counters as plain data, e.g. to send to another process."""
+        self.expire()
+        with self._lock:
+            t = self._table
+            return {"raw": self._hist_raw.to_dict(), "corrected": self._hist_cor.to_dict(),
+                    "no_response": t.no_response, "pending": t.live, "rejects": self._rejects}
+
+    @classmethod
+    def merge_exports(cls, parts):
+        """summary()-shaped dict over several export() results (e.g. one per worker)."""
+        raw, cor = LogLinearHistogram(), LogLinearHistogram()
+        no_response = pending = rejects = 0
+        for p in parts:
+            raw.merge(LogLinearHistogram.from_dict(p["raw"]))
+            cor.merge(LogLinearHistogram.from_dict(p["corrected"]))
+            no_response += p["no_response"]
+            pending += p["pending"]
+            rejects += p.get("rejects", 0)
+        return cls._summarize(raw, cor, no_response, pending, rejects)
 
     def summary(self):
+        """Raw stats at the top level (as before) plus 'corrected' stats."""
+        self.expire()
         with self._lock:
-            arr = list(self._lat_ms)
-        if not arr:
-            return {"n": 0}
-        arr_sorted = sorted(arr)
-        n = len(arr_sorted)
-        mean = statistics.fmean(arr_sorted)
-        p50 = arr_sorted[int(0.50*(n-1))]
-        p90 = arr_sorted[int(0.90*(n-1))]
-        p99 = arr_sorted[int(0.99*(n-1))]
-        mx  = arr_sorted[-1]
-        return {"n": n, "mean": mean, "p50": p50, "p90": p90, "p99": p99, "max": mx}
+            return self._summary_locked()
+
+    def tag_summaries(self):
+        """[(name, sent, summary()-shaped dict)] per registered tag.
+
+        With enable_fills() each dict also has a "fills" summary()-shaped dict.
+        """
+        with self._lock:
+            out = []
+            for t in self._tags:
+                s = self._summarize(t["raw"], t["corrected"], 0, 0, t["rejects"])
+                if self._fills is not None:
+                    s["fills"] = self._summarize(t["fill_raw"], t["fill_cor"], 0, 0)
+                out.append((t["name"], t["sent"], s))
+            return out
+
+    def tag_lines(self, prefix="[MIX]"):
+        lines = []
+        for name, sent, s in self.tag_summaries():
+            n = s["n"]
+            if n == 0:
+                lines.append(f"{prefix} {name:<40} sent={sent} acks=0")
+                continue
+            c = s["corrected"]
+            line = (f"{prefix} {name:<40} sent={sent} acks={n} rejects={s['rejects']}  "
+                    f"p50={s['p50']:.2f}ms p99={s['p99']:.2f}ms max={s['max']:.2f}ms  "
+                    f"corrected p50={c['p50']:.2f}ms p99={c['p99']:.2f}ms")
+            f = s.get("fills")
+            if f is not None:
+                line += f"  | fills={f['n']}"
+                if f["n"]:
+                    line += (f" p50={f['p50']:.2f}ms p99={f['p99']:.2f}ms max={f['max']:.2f}ms "
+                             f"corrected p99={f['corrected']['p99']:.2f}ms")
+            lines.append(line)
+        return lines
+
+    def fill_summary(self):
+        """summary()-shaped dict for send -> first fill; no_response = timed out unfilled."""
+        with self._lock:
+            t = self._fills
+            if t is None:
+                return None
+            t.expire(self._now_ns())
+            return self._summarize(self._fill_raw, self._fill_cor, t.no_response, t.live)
+
+    def fill_line(self, prefix="[FILL]"):
+        """Order-to-fill section for the final report; None unless enable_fills() was called."""
+        s = self.fill_summary()
+        if s is None:
+            return None
+        return self.format_line(s, prefix).replace("no_response=", "unfilled=")
 
     def summary_line(self, prefix=""):
-        s = self.summary()
+        return self.format_line(self.summary(), prefix)
+
+    def warmup_summary(self):
+        """summary()-shaped dict for the warm-up orders, plus how many were sent."""
+        with self._lock:
+            s = self._summarize(self._warm_raw, self._warm_cor, 0, 0, self._warm_rejects)
+            s["orders"] = self._warm_n
+        return s
+
+    def warmup_line(self, prefix="[WARMUP]"):
+        """Warm-up section for the final report; None when no warm-up was configured."""
+        if not (self.warmup_orders > 0 or self.warmup_s > 0):
+            return None
+        s = self.warmup_summary()
+        return f"{prefix} orders={s['orders']} (excluded above) |" + self.format_line(s, "")
+
+    @staticmethod
+    def format_line(s, prefix=""):
         if s.get("n", 0) == 0:
-            return f"{prefix} n=0 (no samples yet)"
-        return (f"{prefix} n={s['n']}  mean={s['mean']:.2f}ms  p50={s['p50']:.2f}ms  "
-                f"p90={s['p90']:.2f}ms  p99={s['p99']:.2f}ms  max={s['max']:.2f}ms")
+            return f"{prefix} n=0 (no samples yet)  no_response={s['no_response']}  pending={s['pending']}"
+        c = s["corrected"]
+        return (f"{prefix} n={s['n']}  rejects={s['rejects']}  no_response={s['no_response']}  pending={s['pending']}  mean={s['mean']:.2f}ms  p50={s['p50']:.2f}ms  "
+                f"p90={s['p90']:.2f}ms  p99={s['p99']:.2f}ms  max={s['max']:.2f}ms  |  "
+                f"corrected mean={c['mean']:.2f}ms  p50={c['p50']:.2f}ms  "
+                f"p90={c['p90']:.2f}ms  p99={c['p99']:.2f}ms  max={c['max']:.2f}ms")
+
+# ===== ER plumbing (shared with MasterSendOrders.RPVersion.py) =====
+def track_exec_report(lat: LatencyTracker, msg):
+    """Feeds an incoming ExecReport (35=8) or OrderCancelReject (35=9) to the tracker.
+
+    Returns (msgtype, clordid, orderid, exectype, ordstatus) for those two, else None,
+    so callers keeping their own order state don't have to parse the message again.
+    """
+    mt = fix.MsgType(); msg.getHeader().getField(mt)
+    msgtype = mt.getValue()
+    if msgtype == fix.MsgType_OrderCancelReject:
+        cl_val = order_id = ordstatus = None
+        try:
+            cl = fix.ClOrdID(); msg.getField(cl); cl_val = cl.getValue()
+        except fix.FieldNotFound:
+            pass
+        try:
+            oid = fix.OrderID(); msg.getField(oid); order_id = oid.getValue()
+        except fix.FieldNotFound:
+            pass
+        try:
+            osf = fix.OrdStatus(); msg.getField(osf); ordstatus = osf.getValue()
+        except fix.FieldNotFound:
+            pass
+        if cl_val:
+            lat.note_exec_report(cl_val, order_id, "", ordstatus or "", None, None, None, rejected=True)
+        return msgtype, cl_val, order_id, None, ordstatus
+    if msgtype != fix.MsgType_ExecutionReport:
+        return None
+    # Pull correlation fields
+    cl_val = None
+    try:
+        cl = fix.ClOrdID(); msg.getField(cl); cl_val = cl.getValue()
+    except fix.FieldNotFound:
+        pass
+
+    order_id = None
+    try:
+        oid = fix.OrderID(); msg.getField(oid); order_id = oid.getValue()
+    except fix.FieldNotFound:
+        pass
+
+    exectype = None
+    try:
+        et = fix.ExecType(); msg.getField(et); exectype = et.getValue()
+    except fix.FieldNotFound:
+        pass
+
+    ordstatus = None
+    try:
+        osf = fix.OrdStatus(); msg.getField(osf); ordstatus = osf.getValue()
+    except fix.FieldNotFound:
+        pass
+
+    # Optional – for CSV detail
+    price = None
+    try:
+        pr = fix.Price(); msg.getField(pr); price = float(pr.getValue())
+    except fix.FieldNotFound:
+        pass
+
+    qty = None
+    try:
+        oq = fix.OrderQty(); msg.getField(oq); qty = float(oq.getValue())
+    except fix.FieldNotFound:
+        pass
+
+    symbol = None
+    try:
+        sy = fix.Symbol(); msg.getField(sy); symbol = sy.getValue()
+    except fix.FieldNotFound:
+        pass
+
+    if cl_val:
+        lat.note_exec_report(cl_val, order_id, exectype or "", ordstatus or "", price, qty, symbol)
+    return msgtype, cl_val, order_id, exectype, ordstatus
 
 # ===== App =====
 class App(fix.Application):
-    def __init__(self):
+    def __init__(self, sender_sub_id: str = SENDER_SUB_ID, file_tag: str = "",
+                 max_in_flight: int = MAX_IN_FLIGHT, clordid_prefix: Optional[str] = None):
+        # file_tag keeps parallel processes (load_fanout.py workers) off each other's files;
+        # clordid_prefix keeps their ClOrdIDs apart (ClOrdIdGen's default is only unique per second)
         super().__init__()
         self.session_id = None
-        self.lat = LatencyTracker(data_dir / "latency.csv")
+        self.sender_sub_id = sender_sub_id
+        self.clgen = ClOrdIdGen(CLSEQ_FILE.with_name(f"clseq{file_tag}.dat"), prefix=clordid_prefix)
+        self.lat = LatencyTracker(data_dir / f"latency{file_tag}.csv", self.clgen.prefix)
+        self.rplog = BatchedWriter(rplog_file.with_name(f"rpapp{file_tag}.log"))
+        self.templates = NosTemplateBook(fix.TimeInForce_DAY)   # 59=0 (DAY); GTC: fix.TimeInForce_GOOD_TILL_CANCEL
+        # optional backpressure: slots come back via the tracker on first ER / timeout
+        self.window = InFlightWindow(max_in_flight, WINDOW_POLICY) if max_in_flight > 0 else None
+        if self.window:
+            self.window.on_wait = self.lat.expire
+            self.lat.window = self.window
+        # every app message takes a token first so we stay under the venue's rate limit
+        self.throttle = TokenBucket(VENUE_MSG_RATE, VENUE_BURST) if VENUE_MSG_RATE > 0 else None
 
     # lifecycle
     def onCreate(self, sid): pass
@@ -150,11 +585,13 @@ class App(fix.Application):
     # app plumbing
     def toApp(self, msg, sid):
         # Add SenderSubID(50) to *all* application messages
-        msg.getHeader().setField(fix.SenderSubID(SENDER_SUB_ID))
+        msg.getHeader().setField(fix.SenderSubID(self.sender_sub_id))
 
-        # If this is our outgoing NOS (35=D), remember send time keyed by ClOrdID(11)
+        # If this is our outgoing NOS (35=D) or cancel / replace (F / G, e.g. from
+        # replay_log.py), remember send time keyed by ClOrdID(11)
         mt = fix.MsgType(); msg.getHeader().getField(mt)
-        if mt.getValue() == fix.MsgType_NewOrderSingle:
+        if mt.getValue() in (fix.MsgType_NewOrderSingle, fix.MsgType_OrderCancelRequest,
+                             fix.MsgType_OrderCancelReplaceRequest):
             try:
                 cl = fix.ClOrdID(); msg.getField(cl)
                 self.lat.note_send(cl.getValue())
@@ -165,84 +602,38 @@ class App(fix.Application):
         # print & raw-log everything we receive
         wire = msg.toString()
         print("[APP]", wire)
-        with rplog_file.open("a", encoding="utf-8") as f:
-            f.write(wire + "\n")
+        self.rplog.write(wire)
 
         # For ExecReports (35=8), compute latency for the first ER per ClOrdID.
-        mt = fix.MsgType(); msg.getHeader().getField(mt)
-        if mt.getValue() == fix.MsgType_ExecutionReport:
-            # Pull correlation fields
-            cl_val = None
-            try:
-                cl = fix.ClOrdID(); msg.getField(cl); cl_val = cl.getValue()
-            except fix.FieldNotFound:
-                pass
-
-            order_id = None
-            try:
-                oid = fix.OrderID(); msg.getField(oid); order_id = oid.getValue()
-            except fix.FieldNotFound:
-                pass
-
-            exectype = None
-            try:
-                et = fix.ExecType(); msg.getField(et); exectype = et.getValue()
-            except fix.FieldNotFound:
-                pass
-
-            ordstatus = None
-            try:
-                osf = fix.OrdStatus(); msg.getField(osf); ordstatus = osf.getValue()
-            except fix.FieldNotFound:
-                pass
-
-            # Optional – for CSV detail
-            price = None
-            try:
-                pr = fix.Price(); msg.getField(pr); price = float(pr.getValue())
-            except fix.FieldNotFound:
-                pass
-
-            qty = None
-            try:
-                oq = fix.OrderQty(); msg.getField(oq); qty = float(oq.getValue())
-            except fix.FieldNotFound:
-                pass
-
-            symbol = None
-            try:
-                sy = fix.Symbol(); msg.getField(sy); symbol = sy.getValue()
-            except fix.FieldNotFound:
-                pass
-
-            if cl_val:
-                self.lat.note_exec_report(cl_val, order_id, exectype or "", ordstatus or "", price, qty, symbol)
+        track_exec_report(self.lat, msg)
 
     # ===== Actions =====
-    def send_gtc_limit(self, symbol, buy, qty, price, sec_subtype, account=None):
-        nos = fix50sp2.NewOrderSingle()
-        nos.setField(fix.ClOrdID("CL-" + str(uuid.uuid4())))               # 11
-        if account: nos.setField(fix.Account(account))                      # 1
-        nos.setField(fix.Symbol(symbol))                                    # 55
-        nos.setField(fix.Side(fix.Side_BUY if buy else fix.Side_SELL))      # 54
-        nos.setField(fix.TransactTime())                                    # 60 (now)
-        nos.setField(fix.OrdType(fix.OrdType_LIMIT))                        # 40=2
-        nos.setField(fix.OrderQty(float(qty)))                              # 38
-        nos.setField(fix.Price(float(price)))                               # 44
-        nos.setField(fix.CustOrderCapacity(1))                              # 582
-        nos.setField(fix.AccountType(1))                                    # 581
-        nos.setField(fix.SecuritySubType(sec_subtype))                      # 762
-        nos.setField(fix.TimeInForce(fix.TimeInForce_DAY))                  # 59=1 (TID)
-        #nos.setField(fix.TimeInForce(fix.TimeInForce_GOOD_TILL_CANCEL))     # 59=1 (GTC)
+    def send_gtc_limit(self, symbol, buy, qty, price, sec_subtype, account=None, intended_ns=None):
+        if self.window and not self.window.acquire():
+            return None     # window full and policy says skip
+        clid = self.clgen.next_id()
+        self.lat.note_intended(clid, intended_ns)
+        nos = self.templates.get(symbol, sec_subtype, qty, account, buy).build(clid, price)   # 11, 60, 44
+        if self.throttle:
+            self.throttle.acquire()
         ok = fix.Session.sendToTarget(nos, self.session_id)
+        # hand the window slot back: through the tracker if it has the order, else directly
+        if not ok and not self.lat.discard(clid) and self.window:
+            self.window.release()
         print(f"[SEND] GTC LIMIT {symbol} {('BUY' if buy else 'SELL')} {qty} @ {price} {sec_subtype} -> {ok}")
-        with rplog_file.open("a", encoding="utf-8") as f:
-            f.write(f"[SEND] GTC LIMIT {symbol} {('BUY' if buy else 'SELL')} {qty} @ {price} {sec_subtype} -> {ok}\n")
+        self.rplog.write(f"[SEND] GTC LIMIT {symbol} {('BUY' if buy else 'SELL')} {qty} @ {price} {sec_subtype} -> {ok}")
+
+    def close_logs(self):
+        # stop the engine first so no callback writes after this
+        self.rplog.close()
+        print(self.rplog.summary_line())
+        self.lat.close()
+        self.clgen.close()
 
 # ===== Main =====
-def main(cfg):
+def main(cfg, max_in_flight=MAX_IN_FLIGHT):
     settings = fix.SessionSettings(cfg)
-    app = App()
+    app = App(max_in_flight=max_in_flight)
     store = fix.FileStoreFactory(settings)
     logs  = fix.FileLogFactory(settings)
     init = fix.SocketInitiator(app, store, settings, logs)
@@ -253,31 +644,40 @@ def main(cfg):
         while app.session_id is None:
             time.sleep(0.05)
 
-        i = 1
-        new_price = PRICE
-        while i <= maxloop:
-            new_price += incr
-            app.send_gtc_limit(SYMBOL, SIDE_BUY, QTY, new_price, "YES", ACCOUNT)
-            app.send_gtc_limit(SYMBOL, SIDE_BUY, QTY, new_price, "NO", ACCOUNT)
-            time.sleep(0.01)
-            if i % 50 == 0:
+        # one YES+NO pair per slot; both legs share the slot's planned time so
+        # any stall in our sender is charged to the corrected latency
+        def send_pair(i, planned_ns):
+            new_price = PRICE + incr * (i + 1)
+            app.send_gtc_limit(SYMBOL, SIDE_BUY, QTY, new_price, "YES", ACCOUNT, intended_ns=planned_ns)
+            app.send_gtc_limit(SYMBOL, SIDE_BUY, QTY, new_price, "NO", ACCOUNT, intended_ns=planned_ns)
+            if (i + 1) % 50 == 0:
                 # mid-run stats pulse
                 print(app.lat.summary_line(prefix="[STATS]"))
-            i += 1
+
+        sched = OpenLoopScheduler(TARGET_QPS, max_orders=maxloop)
+        sched.run(send_pair)
+        print(sched.summary_line(prefix="[SCHED]"))
 
         # keep session alive to receive ExecReports
         while True:
             time.sleep(1)
     except KeyboardInterrupt:
-         summary(self)
-         summary_line(self, prefix="")
+        pass
 
     finally:
         print(app.lat.summary_line(prefix="[FINAL]"))
+        warm = app.lat.warmup_line()
+        if warm:
+            print(warm)
+        if app.window:
+            print(app.window.summary_line())
+        if app.throttle:
+            print(app.throttle.summary_line())
         init.stop()
+        app.close_logs()
 
 if __name__ == "__main__":
     import sys
-    if len(sys.argv)!=2:
-        print("Usage: python ep3_limit_gtc.py initiator.cfg"); raise SystemExit(1)
-    main(sys.argv[1])
\ No newline at end of file
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python FIXLatencyTester.py initiator.cfg [max_in_flight]"); raise SystemExit(1)
+    main(sys.argv[1], int(sys.argv[2]) if len(sys.argv) == 3 else MAX_IN_FLIGHT)
\ No newline at end of file
@@ -1,26 +1,50 @@
 #!/usr/bin/env python3
-import time, uuid, threading, re, pytz, sys, statistics, datetime
+import time, sys, random
 import quickfix as fix
-import quickfix50sp2 as fix50sp2
 
-from decimal import Decimal, ROUND_HALF_UP
-from dataclasses import dataclass
+from decimal import Decimal
 from pathlib import Path
 from datetime import datetime
+from order_scheduler import OpenLoopScheduler, build_arrivals
+from async_writer import BatchedWriter
+from order_templates import NosTemplateBook, build_cancel, build_replace
+from price_ladder import PriceLadder, ladder_walk, to_tick, tick_str, MIN_TICK, MAX_TICK
+from itertools import islice
+from clordid_gen import ClOrdIdGen
+from order_mix import OrderMix, TradeType, shuffled_schedule
+from order_lifecycle import LiveOrderBook, LiveOrder
+from FIXLatencyTester import LatencyTracker, track_exec_report
+from token_bucket import TokenBucket
+from send_pipeline import SendPipeline
+from low_jitter import LowJitter
+from contextlib import ExitStack
 
 rpdir = Path("/home/ec2-user/pythonQF")
 
-def _q(x, quantum="0.01"):
-        # Quantize Decimal x to the given quantum string (default 1 cent)
-        return Decimal(x).quantize(Decimal(quantum), rounding=ROUND_HALF_UP)
+VALID_MODES = ("simplerepeat", "layer", "mix", "lifecycle", "cross", "saturate")
 
+if len(sys.argv) < 3:
+    sys.exit(f"Usage: python3 MasterSendOrders.RPVersion.py <initiator.cfg> <mode>  ({'|'.join(VALID_MODES)})")
 cfg = sys.argv[1]
 trademode = sys.argv[2].lower()
+if trademode not in VALID_MODES:
+    sys.exit(f"unknown mode {sys.argv[2]!r}; expected one of: {', '.join(VALID_MODES)}")
 
 if trademode == "simplerepeat":
     PRICE  = 0.52
     QTY = 1
     maxloop = 25
+    TARGET_QPS  = 100      # open-loop send rate (orders/sec)
+    RUN_SECONDS = None     # run length; None = stop after maxloop orders
+    SPIN_US     = 200      # sleep until this close to each send time, then spin
+    ARRIVAL_PROFILE = "constant"   # constant | poisson | onoff | replay
+    ARRIVAL_SEED    = 1            # same seed -> same timetable (poisson, onoff with poisson gaps)
+    BURST_ON_S      = 1.0          # onoff: seconds sending at TARGET_QPS...
+    BURST_OFF_S     = 4.0          # ...then seconds silent
+    ARRIVAL_ONOFF_POISSON = False  # onoff: Poisson gaps inside a burst instead of evenly spaced
+    REPLAY_LOG      = None         # replay: QuickFIX messages log to take 35=D gaps from
+    REPLAY_SPEED    = 1.0          # replay: 2.0 = twice as fast as captured
+    SEND_PIPELINE   = 0            # ring size (power of 2) to hand orders to a sender thread; 0 = send inline
 
 elif trademode == "layer":
     PRICE   = 0.52       # starting price
@@ -28,6 +52,59 @@ elif trademode == "layer":
     maxloop = 25         # number of up/down passes on the ladder
     scope   = 0.10       # total range, e.g. 0.52–0.62
     step    = 0.01       # increment size per layer    
+    LAYER_MIRROR = None  # e.g. ("NO", "noTippy") to interleave a NO ladder at 1 - p
+    LAYER_MIX    = None  # e.g. order_mix.matrix(["yesTippy", "noTippy"], [SYMBOL]): per-order account/symbol/762/qty
+    SEND_PIPELINE = 0    # ring size (power of 2): this thread walks the ladder, a sender thread sends; 0 = inline
+
+elif trademode == "mix":
+    PRICE   = 0.52
+    QTY     = 1
+    maxloop = 1000             # orders in the whole schedule
+    TARGET_QPS = 100           # open-loop send rate (orders/sec)
+    MIX_SEED   = 1             # same seed -> same interleaving
+    SEND_PIPELINE = 0          # ring size (power of 2) to hand orders to a sender thread; 0 = send inline
+    # weighted account x symbol x 762 x qty combinations; the schedule is built once before sending
+    MIX = [
+        TradeType("yesRonaldo", "CBBTC_123125_132500", "YES", 1, weight=2),
+        TradeType("noRonaldo",  "CBBTC_123125_132500", "NO",  1, weight=2),
+        TradeType("yesTippy",   "CBBTC_123125_132500", "YES", 1),
+        TradeType("noTippy",    "CBBTC_123125_132500", "NO",  1),
+        TradeType("RPTEST",     "CBBTC_123125_142500", "YES", 3),
+        TradeType("RPTEST",     "CBBTC_123125_142500", "NO",  3),
+    ]
+    # or the full cross product at equal weight (from order_mix import matrix):
+    # MIX = matrix(["yesRonaldo", "noRonaldo", "RPTEST", "yesTippy", "noTippy"],
+    #              ["CBBTC_123125_65000", "CBBTC_123125_142500", "CBBTC_123125_132500"])
+
+elif trademode == "lifecycle":
+    PRICE   = 0.52
+    QTY     = 1
+    maxloop = 1000                 # total requests (D + F + G)
+    TARGET_QPS = 100               # open-loop request rate (requests/sec)
+    LC_WEIGHTS = {"D": 6, "F": 2, "G": 2}   # share of NewOrderSingle / Cancel / CancelReplace
+    LC_SEED    = 1                 # schedule order and which live order gets picked
+    LC_REPLACE_TICKS = 1           # a replace moves the price this many cents up or down
+
+elif trademode == "cross":
+    PRICE   = 0.52            # YES leg; the NO leg goes at 1 - PRICE so every pair crosses itself
+    QTY     = 1
+    maxloop = 100             # YES/NO pairs
+    TARGET_QPS = 10           # pairs per second (open-loop)
+    CROSS_YES_ACCOUNT = "yesTippy"
+    CROSS_NO_ACCOUNT  = "noTippy"
+    CROSS_DRAIN_S = 10        # max wait after the last pair for outstanding fills
+
+elif trademode == "saturate":
+    PRICE   = 0.52
+    QTY     = 1
+    SAT_START_QPS  = 50       # first step
+    SAT_STEP_QPS   = 50       # added each step
+    SAT_MAX_QPS    = 2000     # never go past this
+    SAT_HOLD_S     = 10       # seconds at each step
+    SAT_DRAIN_S    = 5        # max wait after a step for its ERs before scoring it
+    SAT_SLO_P99_MS = 50.0     # corrected p99 ack latency a step must stay under
+    SAT_MAX_REJECT_PCT = 1.0  # ...and rejects (ExecType=8) as % of acks
+    SAT_MIN_RATE_PCT   = 90.0 # ...and we must actually send at >= this % of target
 
 print("The Price is: ", PRICE, "and trademode is: ", trademode)
 user_input = input("Pause check above then hit enter")   #pause before executing just in case
@@ -36,6 +113,7 @@ user_input = input("Pause check above then hit enter")   #pause before executing
 data_dir = rpdir / "data"
 log_file = rpdir / "logs" / "app.log"
 rplog_file = rpdir / "logs" / "rpapp.log"
+rplog = BatchedWriter(rplog_file)   # background writer; keeps file I/O off the send path
 
 # arguments:
 SENDER_SUB_ID  = "4C001"
@@ -51,12 +129,26 @@ SYMBOL = "CBBTC_123125_132500"
 SecSubType = "YES"
 # SecSubType = "NO"
 SIDE_BUY = True  # this is always true with our products
+VENUE_MSG_RATE = 0   # app messages/sec the venue allows (NOS + cancels + replaces); 0 = no throttle
+VENUE_BURST    = 1   # messages allowed back-to-back before the rate applies
+WARMUP_ORDERS  = 0   # first N orders are warm-up: sent, but reported apart from the headline stats
+WARMUP_S       = 0.0 # ...and/or the first N seconds of sends
+LOW_JITTER     = False   # gc freeze/off + CPU pinning while the trading loop runs (low_jitter.py)
+JITTER_CPUS    = None    # e.g. {2, 3}: cores for the sending thread in low-jitter mode
+JITTER_RT_PRIO = None    # e.g. 10: SCHED_FIFO priority (needs root / CAP_SYS_NICE)
 
 class App(fix.Application):
     def __init__(self):
         super().__init__()
         self.session_id = None 
         self.logged_on = False
+        self.templates = NosTemplateBook(fix.TimeInForce_DAY)   # DAY 59=0; one pre-built NOS per trade type
+        self.clgen = ClOrdIdGen(data_dir / "clseq.dat")          # run prefix + counter, persisted in blocks
+        self.lat = LatencyTracker(data_dir / "latency.csv", self.clgen.prefix,   # first-ER latency per order
+                                  warmup_orders=WARMUP_ORDERS, warmup_s=WARMUP_S)
+        self.live = None                                                 # LiveOrderBook in lifecycle mode
+        # one bucket for every app message on the session (see token_bucket.py)
+        self.throttle = TokenBucket(VENUE_MSG_RATE, VENUE_BURST) if VENUE_MSG_RATE > 0 else None
         
     def onCreate(self, sid):
         # CRITICAL: Set the session ID here upon creation
@@ -111,115 +203,381 @@ class App(fix.Application):
     def toApp(self, msg, sid):
         # Add SenderSubID(50) to *all* application messages
         msg.getHeader().setField(fix.SenderSubID(SENDER_SUB_ID))
+        # NOS (35=D), cancel (F), cancel/replace (G): start the latency clock for its ClOrdID(11)
+        mt = fix.MsgType(); msg.getHeader().getField(mt)
+        if mt.getValue() in (fix.MsgType_NewOrderSingle, fix.MsgType_OrderCancelRequest,
+                             fix.MsgType_OrderCancelReplaceRequest):
+            cl = fix.ClOrdID(); msg.getField(cl)
+            self.lat.note_send(cl.getValue())
 
     def fromApp(self, msg, sid):
-        with rplog_file.open("a", encoding="utf-8") as f:
-            f.write(msg.toString() + "\n")   
-
-    def send_limit(self, symbol, buy, qty, price, SecSubType, account=None):
-        nos = fix50sp2.NewOrderSingle()
-        nos.setField(fix.ClOrdID("CL-" + str(uuid.uuid4())))               # 11
-        if account: nos.setField(fix.Account(account))                     # 1
-        nos.setField(fix.Symbol(symbol))                                   # 55
-        nos.setField(fix.Side(fix.Side_BUY))                               # 54 always BUY
-        nos.setField(fix.TransactTime())                                   # 60 (now)
-        nos.setField(fix.OrdType(fix.OrdType_LIMIT))                       # 40=2
-        nos.setField(fix.OrderQty(float(qty)))                             # 38
-        nos.setField(fix.Price(float(price)))                              # 44
-        nos.setField(fix.CustOrderCapacity(1))                             # 582 = 5 (RETAIL
-        nos.setField(fix.AccountType(1))                                   # 581 
-        nos.setField(fix.SecuritySubType(SecSubType))                      # 762 Required for YES NO
-        # tif = TimeInForce_GOOD_TILL_CANCEL
-        # tif = TimeInForce_DAY ###to move tif outside this def, need to add as a param of def ##
-        # nos.setField(fix.TimeInForce(fix.TimeInForce_GOOD_TILL_CANCEL))  # 59=1 (GTC)
-        # nos.setField(fix.TimeInForce(fix.tif)    # DAY 59=0 (DAY)
-        nos.setField(fix.TimeInForce(fix.TimeInForce_DAY))                 # DAY 59=0 (DAY)
+        rplog.write(msg.toString())
+        r = track_exec_report(self.lat, msg)
+        if r and self.live is not None:
+            msgtype, clid, orderid, exectype, ordstatus = r
+            if msgtype == fix.MsgType_OrderCancelReject:
+                self.live.on_cancel_reject(clid)
+            elif clid:
+                self.live.on_exec_report(clid, orderid, exectype, ordstatus)
+
+    def send_limit(self, symbol, buy, qty, price, SecSubType, account=None, intended_ns=None, tag=-1):
+        # static tags (1, 55, 54, 40, 38, 582, 581, 762, 59) live in the template; see order_templates.py
+        # 582 = 1, 581 = 1, 762 Required for YES NO, tif is set on self.templates
+        tmpl = self.templates.get(symbol, SecSubType, qty, account, buy)
+        clid = self.clgen.next_id()
+        self.lat.note_intended(clid, intended_ns, tag)                      # scheduler's planned time, if any
+        if self.live is not None:
+            self.live.note_sent(clid, LiveOrder(symbol, buy, qty, to_tick(price), SecSubType, account, None))
+        nos = tmpl.build(clid, price)                                       # 11, 60 (now), 44
+        if self.throttle:
+            self.throttle.acquire()
         ok = fix.Session.sendToTarget(nos, self.session_id)
+        if not ok:
+            self.lat.discard(clid)
+            if self.live is not None:
+                self.live.send_failed(clid)
         # nos.setField(fix.TimeInForce(0))                                 # 59=1 (GTC) and DAY = 0 THIS DOES NOT WORK!!!
         # print(f"[SEND] GTC LIMIT {symbol} {('BUY' if buy else 'SELL')} {qty} @ {price} {SecSubType} -> {ok}")
         msgstrrp = (f"[SEND] GTC LIMIT {symbol} {('BUY' if buy else 'SELL')} {qty} @ {price} {SecSubType} -> {ok}")
-        with rplog_file.open("a", encoding="utf-8") as f:
-            f.write(msgstrrp + "\n")    
+        rplog.write(msgstrrp)
+
+    def send_cancel(self, orig_clid, order, intended_ns=None, tag=-1):
+        # 35=F for one of our live orders (order: LiveOrder from self.live)
+        clid = self.clgen.next_id()
+        self.lat.note_intended(clid, intended_ns, tag)
+        self.live.note_sent(clid, order, "F")
+        msg = build_cancel(clid, orig_clid, order.symbol, order.buy, order.sec_subtype,
+                           order.account, order.qty, order.orderid)
+        if self.throttle:
+            self.throttle.acquire()
+        ok = fix.Session.sendToTarget(msg, self.session_id)
+        if not ok:
+            self.lat.discard(clid)
+            self.live.send_failed(clid, orig_clid, order)
+        rplog.write(f"[CXL] {order.symbol} 41={orig_clid} 11={clid} -> {ok}")
+
+    def send_replace(self, orig_clid, order, tick, intended_ns=None, tag=-1):
+        # 35=G: same order at a new price (tick in cents)
+        clid = self.clgen.next_id()
+        self.lat.note_intended(clid, intended_ns, tag)
+        self.live.note_sent(clid, order._replace(price=tick), "G")
+        msg = build_replace(clid, orig_clid, order.symbol, order.buy, order.qty, tick_str(tick),
+                            order.sec_subtype, order.account, order.orderid, self.templates.tif)
+        if self.throttle:
+            self.throttle.acquire()
+        ok = fix.Session.sendToTarget(msg, self.session_id)
+        if not ok:
+            self.lat.discard(clid)
+            self.live.send_failed(clid, orig_clid, order)
+        rplog.write(f"[RPL] {order.symbol} 41={orig_clid} 11={clid} @ {tick_str(tick)} -> {ok}")
 
     def run_layer_with_maxloop(app, symbol, price, scope, step, qty, account, secsubtype,
-                            side_buy=True, price_quantum="0.01", max_orders=1000):
+                            side_buy=True, max_orders=1000, ladders=None, mix=None):
 
         # Sends up to max_orders orders while bouncing the price between
         # [price .. price+scope] inclusive, stepping by 'step' and reversing at the edges.
-        
-        low  = _q(str(price),  price_quantum)
-        high = _q(str(Decimal(str(price)) + Decimal(str(scope))), price_quantum)
-        inc  = _q(str(step),   price_quantum)
-
-        # current price and direction (+1 up, -1 down)
-        current    = low
-        direction  = Decimal(1)
-
-        orders_sent = 0
-
-        # Optional: 10 trade "types" (uncomment / customize if you want per-tick variety)
-        TRADE_TYPES = None
-        # Example:
-        # TRADE_TYPES = [
-        #     {"account":"yesRonaldo","secsub":"YES","qty":1},
-        #     {"account":"yesRonaldo","secsub":"NO", "qty":1},
-        #     {"account":"noRonaldo", "secsub":"YES","qty":2},
-        #     {"account":"noRonaldo", "secsub":"NO", "qty":2},
-        #     {"account":"RPTEST",    "secsub":"YES","qty":3},
-        #     {"account":"RPTEST",    "secsub":"NO", "qty":3},
-        #     {"account":"yesTippy",  "secsub":"YES","qty":1},
-        #     {"account":"yesTippy",  "secsub":"NO", "qty":1},
-        #     {"account":"noTippy",   "secsub":"YES","qty":2},
-        #     {"account":"noTippy",   "secsub":"NO", "qty":2},
-        # ]
-        # TRADE_Products = [
-        #     {"# SYMBOL = "CBBTC_123125_65000""},
-        #     {"SYMBOL = "CBBTC_123125_142500""},
-        #     {"SYMBOL = "MNYCG_110425_Mamdani""},
-        #     {"SYMBOL = "CBBTC_123125_132500""}
-        # ]
-
-        while orders_sent < max_orders:
-            # send one (or many) order(s) at 'current'
-            if TRADE_TYPES:
-                for tt in TRADE_TYPES:
-                    if orders_sent >= max_orders:
-                        break
-                    app.send_limit(
-                        symbol=symbol,
-                        buy=side_buy,
-                        qty=tt["qty"],
-                        price=float(current),
-                        SecSubType=tt["secsub"],
-                        account=tt["account"]
-                    )
-                    orders_sent += 1
-            else:
-                # single-type send using provided account/secsubtype/qty
-                app.send_limit(
-                    symbol=symbol,
-                    buy=side_buy,
-                    qty=qty,
-                    price=float(current),
-                    SecSubType=secsubtype,
-                    account=account
-                )
+        # The bounce is precomputed once as integer ticks + price strings (price_ladder.py);
+        # pass several PriceLadder objects in `ladders` to interleave them (e.g. YES and NO).
+        # With an OrderMix, account/symbol/762/qty come from the mix's schedule instead
+        # (one order per ladder step); its tags must already be registered on app.lat.
+        if ladders is None:
+            high = Decimal(str(price)) + Decimal(str(scope))
+            ladders = [PriceLadder(price, high, step, secsubtype, account, qty)]
+
+        walk = ladder_walk(ladders)
+        if mix is not None:
+            orders_sent = 0
+            for (k, tt), (lad, px) in zip(islice(mix, max_orders), walk):
+                app.send_limit(tt.symbol, side_buy, tt.qty, px, tt.sec_subtype, tt.account, tag=k)
                 orders_sent += 1
+            return orders_sent
 
-            # edge checks + bounce
-            if current >= high:
-                direction = Decimal(-1)
-            elif current <= low:
-                direction = Decimal(1)
+        orders_sent = 0
+        for lad, px in islice(walk, max_orders):
+            # single-type send using the ladder's account/secsubtype/qty
+            app.send_limit(
+                symbol=symbol,
+                buy=side_buy,
+                qty=lad.qty,
+                price=px,
+                SecSubType=lad.sec_subtype,
+                account=lad.account
+            )
+            orders_sent += 1
 
-            # step to next price, staying quantized & in-bounds
-            current = _q(str(current + direction * inc), price_quantum)
-            if current > high:
-                current = high
-            if current < low:
-                current = low
+        return orders_sent
 
+# Each mode has a prepare_<mode>(app) that builds everything its loop needs
+# (schedules, ladders, templates, schedulers) and returns run(), which only
+# sends and reports. main() prepares before LOW_JITTER freezes the GC and pins
+# the CPU, so the low-jitter window holds nothing but the sends.
+
+def run_pipelined(app, specs, sched=None):
+    # This thread only produces specs (send_limit args + tag) and hands them to a
+    # SendPipeline; its sender thread builds the NOS and sends it. The pipe's "gen"
+    # stage times drawing the next spec - the ladder step / mix pick / price for
+    # that order. With sched the specs go out on its timetable, else back to back.
+    # Started here rather than in prepare so the sender thread inherits the CPU pinning.
+    pipe = SendPipeline(lambda spec, intended_ns: app.send_limit(*spec[:6], intended_ns=intended_ns,
+                                                                 tag=spec[6]),
+                        SEND_PIPELINE)
+    now = time.perf_counter_ns
+    it = iter(specs)
+
+    def gen_one(i, planned_ns):
+        t0 = now()
+        spec = next(it, None)
+        if spec is not None:
+            pipe.submit(spec, planned_ns, now() - t0)
+        return spec
+
+    if sched is not None:
+        sched.run(gen_one)
+    else:
+        while gen_one(0, None) is not None:
+            pass
+    pipe.close()
+    print(pipe.summary_line())
+    return pipe.sent
+
+def prepare_layer(app):
+    # The whole bounce (low..high..low) is built once as integer ticks with prebuilt
+    # price strings; the loop only walks it.
+    high = Decimal(str(PRICE)) + Decimal(str(scope))
+    ladders = [PriceLadder(PRICE, high, step, SecSubType, ACCOUNT, QTY)]
+    if LAYER_MIRROR:
+        ladders.append(ladders[0].mirrored(*LAYER_MIRROR))
+
+    mix = None
+    if LAYER_MIX:
+        mix = OrderMix(LAYER_MIX, maxloop, seed=1)
+        for t in mix.tags:
+            app.lat.add_tag(t)
+        for tt in mix.types:
+            app.templates.get(tt.symbol, tt.sec_subtype, tt.qty, tt.account, SIDE_BUY)
+    else:
+        for lad in ladders:
+            app.templates.get(SYMBOL, lad.sec_subtype, lad.qty, lad.account, SIDE_BUY)
+
+    def specs():
+        # one send_limit spec per ladder step (+ the mix's pick); the pipeline's "gen" stage
+        walk = ladder_walk(ladders)
+        if mix is not None:
+            for (k, tt), (lad, px) in zip(islice(mix, maxloop), walk):
+                yield tt.symbol, SIDE_BUY, tt.qty, px, tt.sec_subtype, tt.account, k
+        else:
+            for lad, px in islice(walk, maxloop):
+                yield SYMBOL, SIDE_BUY, lad.qty, px, lad.sec_subtype, lad.account, -1
+
+    def run():
+        # Keep sending until we hit maxloop (total orders), round-robin across ladders
+        if SEND_PIPELINE:
+            orders_sent = run_pipelined(app, specs())
+        else:
+            orders_sent = app.run_layer_with_maxloop(SYMBOL, PRICE, scope, step, QTY, ACCOUNT, SecSubType,
+                                                     SIDE_BUY, max_orders=maxloop, ladders=ladders, mix=mix)
+        print(f"[layer] total orders sent: {orders_sent}")
         return orders_sent
+    return run
+
+def prepare_simplerepeat(app):
+    NEWPRICE = PRICE
+    # fixed timetable, built before the first send: orders go out on it no matter
+    # how long each send takes
+    arrivals = build_arrivals(ARRIVAL_PROFILE, TARGET_QPS, maxloop, seed=ARRIVAL_SEED,
+                              on_s=BURST_ON_S, off_s=BURST_OFF_S, poisson=ARRIVAL_ONOFF_POISSON,
+                              replay_log=REPLAY_LOG, speed=REPLAY_SPEED)
+    sched = OpenLoopScheduler(duration_s=RUN_SECONDS, max_orders=maxloop,
+                              spin_us=SPIN_US, arrivals=arrivals)
+    print(f"[simplerepeat] arrivals={ARRIVAL_PROFILE} planned={sched.planned} "
+          f"mean rate={sched.qps:.1f}/s")
+    app.templates.get(SYMBOL, SecSubType, QTY, ACCOUNT, SIDE_BUY)
+
+    def run():
+        if SEND_PIPELINE:
+            # one fixed price here, so "gen" is just building the spec; layer/mix do more per order
+            orders_sent = run_pipelined(app, ((SYMBOL, SIDE_BUY, QTY, NEWPRICE, SecSubType, ACCOUNT, -1)
+                                              for _ in range(sched.planned)), sched)
+        else:
+            orders_sent = sched.run(
+                lambda i, planned_ns: app.send_limit(SYMBOL, SIDE_BUY, QTY, NEWPRICE, SecSubType, ACCOUNT,
+                                                     intended_ns=planned_ns))
+
+        print(f"[simplerepeat] total orders sent: {orders_sent}")
+        print(sched.summary_line(prefix="[SCHED]"))
+        return orders_sent
+    return run
+
+def prepare_mix(app):
+    # whole schedule (who/what for every order) built and shuffled before the first send
+    mix = OrderMix(MIX, maxloop, seed=MIX_SEED)
+    for t in mix.tags:
+        app.lat.add_tag(t)
+    for tt, c in zip(mix.types, mix.counts):
+        print(f"[mix] {tt.tag:<40} weight={tt.weight:g} orders={c}")
+        app.templates.get(tt.symbol, tt.sec_subtype, tt.qty, tt.account, SIDE_BUY)
+    sched = OpenLoopScheduler(TARGET_QPS, max_orders=len(mix))
+
+    def send_one(i, planned_ns):
+        k, tt = mix[i]
+        app.send_limit(tt.symbol, SIDE_BUY, tt.qty, PRICE, tt.sec_subtype, tt.account,
+                       intended_ns=planned_ns, tag=k)
+
+    def run():
+        if SEND_PIPELINE:
+            orders_sent = run_pipelined(app, ((tt.symbol, SIDE_BUY, tt.qty, PRICE, tt.sec_subtype, tt.account, k)
+                                              for k, tt in mix), sched)
+        else:
+            orders_sent = sched.run(send_one)
+        print(f"[mix] total orders sent: {orders_sent}")
+        print(sched.summary_line(prefix="[SCHED]"))
+        return orders_sent
+    return run
+
+def prepare_lifecycle(app):
+    # Open-loop mix of D / F / G. Cancels and replaces go to random live (acked, open)
+    # orders from app.live; with none live yet, that slot sends a NOS instead.
+    kinds = list(LC_WEIGHTS)
+    counts, schedule = shuffled_schedule([LC_WEIGHTS[k] for k in kinds], maxloop, seed=LC_SEED)
+    acks = {"D": "8/0", "F": "8/4", "G": "8/5"}
+    tag = {k: app.lat.add_tag(f"{k} -> {acks.get(k, '?')}") for k in ("D", "F", "G")}
+    app.live = LiveOrderBook(seed=LC_SEED)
+    rng = random.Random(LC_SEED)
+    sent = dict.fromkeys(("D", "F", "G"), 0)
+    fallback = 0
+    app.templates.get(SYMBOL, SecSubType, QTY, ACCOUNT, SIDE_BUY)
+
+    def send_one(i, planned_ns):
+        nonlocal fallback
+        kind = kinds[schedule[i]]
+        picked = app.live.take() if kind in ("F", "G") else None
+        if kind in ("F", "G") and picked is None:
+            kind = "D"
+            fallback += 1
+        if kind == "D":
+            app.send_limit(SYMBOL, SIDE_BUY, QTY, PRICE, SecSubType, ACCOUNT,
+                           intended_ns=planned_ns, tag=tag["D"])
+        elif kind == "F":
+            app.send_cancel(*picked, intended_ns=planned_ns, tag=tag["F"])
+        else:
+            orig, order = picked
+            move = LC_REPLACE_TICKS if rng.random() < 0.5 else -LC_REPLACE_TICKS
+            tick = min(max(order.price + move, MIN_TICK), MAX_TICK)
+            app.send_replace(orig, order, tick, intended_ns=planned_ns, tag=tag["G"])
+        sent[kind] += 1
+
+    print("[lifecycle] planned " + " ".join(f"{k}={c}" for k, c in zip(kinds, counts)))
+    sched = OpenLoopScheduler(TARGET_QPS, max_orders=len(schedule))
+
+    def run():
+        sched.run(send_one)
+        print(f"[lifecycle] sent D={sent['D']} F={sent['F']} G={sent['G']} "
+              f"(F/G sent as D for lack of a live order: {fallback})")
+        print(sched.summary_line(prefix="[SCHED]"))
+        return sched.sent
+    return run
+
+def prepare_cross(app):
+    # Matched pairs: YES buy at p on CROSS_YES_ACCOUNT, then NO buy at 1 - p on
+    # CROSS_NO_ACCOUNT, both at the slot's planned time. The NO leg should trade
+    # against the resting YES leg, so besides the ack (first ER) each leg gets a
+    # fill latency (first ExecType=F). The NO fill is the matching engine's
+    # turnaround; the YES fill also waits for its NO leg to arrive.
+    # Anything else resting at a better price on the venue can take a leg first.
+    app.lat.enable_fills()
+    tag_yes = app.lat.add_tag(f"cross YES {CROSS_YES_ACCOUNT}")
+    tag_no = app.lat.add_tag(f"cross NO  {CROSS_NO_ACCOUNT}")
+    tick = to_tick(PRICE)
+    if not (MIN_TICK <= tick <= MAX_TICK):
+        raise ValueError(f"cross PRICE {PRICE} outside 0.01..0.99")
+    px_yes, px_no = tick_str(tick), tick_str(100 - tick)
+    app.templates.get(SYMBOL, "YES", QTY, CROSS_YES_ACCOUNT, SIDE_BUY)
+    app.templates.get(SYMBOL, "NO", QTY, CROSS_NO_ACCOUNT, SIDE_BUY)
+
+    def send_pair(i, planned_ns):
+        app.send_limit(SYMBOL, SIDE_BUY, QTY, px_yes, "YES", CROSS_YES_ACCOUNT,
+                       intended_ns=planned_ns, tag=tag_yes)
+        app.send_limit(SYMBOL, SIDE_BUY, QTY, px_no, "NO", CROSS_NO_ACCOUNT,
+                       intended_ns=planned_ns, tag=tag_no)
+
+    sched = OpenLoopScheduler(TARGET_QPS, max_orders=maxloop)
+
+    def run():
+        sched.run(send_pair)
+        print(f"[cross] pairs sent: {sched.sent}  YES @ {px_yes} / NO @ {px_no}")
+        print(sched.summary_line(prefix="[SCHED]"))
+        t0 = time.time()
+        while app.lat.fill_summary()["pending"] > 0 and time.time() - t0 < CROSS_DRAIN_S:
+            time.sleep(0.05)
+        return sched.sent
+    return run
+
+def prepare_saturation(app):
+    # Step-load search: hold each rate for SAT_HOLD_S, score it on the ERs it got,
+    # stop at the first step that misses the SLO (the knee). Every step's
+    # timetable is built up front; steps past the knee are just never run.
+    steps = [(rate, OpenLoopScheduler(rate, duration_s=SAT_HOLD_S))
+             for rate in range(SAT_START_QPS, SAT_MAX_QPS + 1, SAT_STEP_QPS)]
+    app.templates.get(SYMBOL, SecSubType, QTY, ACCOUNT, SIDE_BUY)
+
+    def send_one(i, planned_ns):
+        app.send_limit(SYMBOL, SIDE_BUY, QTY, PRICE, SecSubType, ACCOUNT, intended_ns=planned_ns)
+
+    def run():
+        return run_saturation(app, steps, send_one)
+    return run
+
+def run_saturation(app, steps, send_one):
+    rows = []
+    best = None
+    app.lat.interval_summary()        # start the first interval clean
+    for rate, sched in steps:
+        sched.run(send_one)
+        # let this step's ERs land so they aren't charged to the next step
+        t0 = time.time()
+        while app.lat.summary().get("pending", 0) > 0 and time.time() - t0 < SAT_DRAIN_S:
+            time.sleep(0.05)
+        # still unanswered after the drain: this step's loss, even though the
+        # tracker only calls them no_response once ER_TIMEOUT_S runs out
+        stuck = app.lat.summary().get("pending", 0)
+        s = app.lat.interval_summary()
+        sc = sched.summary()
+
+        n = s["n"]
+        actual = sc.get("actual_qps", 0.0)
+        p99 = s["corrected"]["p99"] if n else float("inf")
+        reject_pct = 100.0 * s["rejects"] / n if n else 0.0
+        ok = (n > 0 and p99 <= SAT_SLO_P99_MS and reject_pct <= SAT_MAX_REJECT_PCT
+              and actual >= rate * SAT_MIN_RATE_PCT / 100.0 and s["no_response"] + stuck == 0)
+        rows.append((rate, actual, sc.get("sent", 0), s, reject_pct, ok, stuck))
+        print(f"[SATURATE] target={rate}/s actual={actual:.1f}/s acks={n} "
+              f"p99={p99:.2f}ms rejects={s['rejects']} no_response={s['no_response'] + stuck} "
+              f"-> {'OK' if ok else 'KNEE'}")
+        if not ok:
+            break
+        best = rate
+
+    print()
+    print(f"{'target/s':>9} {'actual/s':>9} {'sent':>7} {'acks':>7} {'p50ms':>8} {'p90ms':>8} "
+          f"{'p99ms':>8} {'co-p99':>8} {'maxms':>8} {'rej%':>6} {'noresp':>7}  slo")
+    for rate, actual, sent, s, reject_pct, ok, stuck in rows:
+        if s["n"]:
+            c = s["corrected"]
+            print(f"{rate:>9} {actual:>9.1f} {sent:>7} {s['n']:>7} {s['p50']:>8.2f} {s['p90']:>8.2f} "
+                  f"{s['p99']:>8.2f} {c['p99']:>8.2f} {s['max']:>8.2f} {reject_pct:>6.2f} {s['no_response'] + stuck:>7}  "
+                  f"{'ok' if ok else 'MISS'}")
+        else:
+            print(f"{rate:>9} {actual:>9.1f} {sent:>7} {0:>7} {'-':>8} {'-':>8} {'-':>8} {'-':>8} {'-':>8} "
+                  f"{'-':>6} {s['no_response'] + stuck:>7}  MISS")
+    if best is None:
+        print(f"[SATURATE] no step met p99<={SAT_SLO_P99_MS}ms; lower SAT_START_QPS")
+    else:
+        print(f"[SATURATE] max sustainable rate: {best}/s (corrected p99 <= {SAT_SLO_P99_MS}ms, "
+              f"rejects <= {SAT_MAX_REJECT_PCT}%)")
+    return best
+
+PREPARE = {"layer": prepare_layer, "simplerepeat": prepare_simplerepeat, "mix": prepare_mix,
+           "lifecycle": prepare_lifecycle, "cross": prepare_cross, "saturate": prepare_saturation}
 
 def main(cfg, trademode):
     settings = fix.SessionSettings(cfg)   
@@ -236,6 +594,8 @@ def main(cfg, trademode):
     logon_timeout_secs = 10 
     start_time = time.time()
     stopped = False
+    jitter = ExitStack()   # holds LowJitter while the trading loop runs
+    lj = None
     
     # Want to delete at some point but this is a good check for now...
     try:
@@ -264,47 +624,20 @@ def main(cfg, trademode):
         print(f"Start time : {start_dt.strftime('%H:%M:%S')}.{ms:03d}")
         print("Before the loop here are the values:",
               SYMBOL, SIDE_BUY, QTY, PRICE, SecSubType, ACCOUNT)
-        
-        # --- main logical main loop start ---
-        if trademode == "layer":
-            # Use the variables you set at the top:
-            low   = _q(PRICE, "0.01")
-            high  = _q(Decimal(str(PRICE)) + Decimal(str(scope)), "0.01")
-            stepD = _q(step, "0.01")
 
-            orders_sent = 0
-            # Keep sending until we hit maxloop (total orders), bouncing between low..high..low
-            while orders_sent < maxloop:
-                # ---- UP LEG: low -> high (inclusive) ----
-                p = low
-                while p <= high and orders_sent < maxloop:
-                    app.send_limit(SYMBOL, SIDE_BUY, QTY, float(p), SecSubType, ACCOUNT)
-                    orders_sent += 1
-                    p = _q(p + stepD, "0.01")
-
-                # ---- DOWN LEG: (high - step) -> low (inclusive) ----
-                p = _q(high - stepD, "0.01")
-                while p >= low and orders_sent < maxloop:
-                    app.send_limit(SYMBOL, SIDE_BUY, QTY, float(p), SecSubType, ACCOUNT)
-                    orders_sent += 1
-                    p = _q(p - stepD, "0.01")
-
-            print(f"[layer] total orders sent: {orders_sent}")
-
-        elif trademode == "simplerepeat":
-            i = 1
-            NEWPRICE = PRICE
-            orders_sent = 0 
-            while i <= maxloop:
-                start = time.perf_counter()                
-                app.send_limit(SYMBOL, SIDE_BUY, QTY, NEWPRICE, SecSubType, ACCOUNT)                
-                time.sleep(0.0001)  # optional throttle current nano (0.0001)
-                i += 1
-                orders_sent += 1 
-
-            print(f"[simplerepeat] total orders sent: {orders_sent}")
+        # build the mode's schedules, ladders, templates and schedulers first; only
+        # run() goes inside the low-jitter window
+        run = PREPARE[trademode](app)
+        if LOW_JITTER:
+            lj = jitter.enter_context(LowJitter(cpus=JITTER_CPUS, rt_priority=JITTER_RT_PRIO))
+
+        # --- main logical main loop start ---
+        run()
 
         # --- main logical main loop end ---
+        jitter.close()
+        if lj:
+            print(lj.summary_line())
 
         # --- END TIMING ---
         end_ns = time.perf_counter_ns()
@@ -328,6 +661,7 @@ def main(cfg, trademode):
         # ensure the engine stops even on errors
         app.logout_and_stop(init, wait_secs=2)     # <<< qualify as method
     finally:
+        jitter.close()
         # safety net: if not already stopped, stop now
         if not stopped:
             try:
@@ -335,21 +669,26 @@ def main(cfg, trademode):
             except Exception:
                 pass
             stopped = True
+        # engine is stopped, so nothing else will queue lines; flush what's left
+        print(app.lat.summary_line(prefix="[FINAL]"))
+        warm = app.lat.warmup_line()
+        if warm:
+            print(warm)
+        fills = app.lat.fill_line()
+        if fills:
+            print(fills)
+        for line in app.lat.tag_lines():
+            print(line)
+        if app.live is not None:
+            print(app.live.summary_line())
+        if app.throttle:
+            print(app.throttle.summary_line())
+        app.lat.close()
+        app.clgen.close()
+        rplog.close()
+        print(rplog.summary_line())
     
-if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python3 MasterSendOrders.RPVersion.py <initiator.cfg> [mode]")
-        sys.exit(1)
-
-    cfg = sys.argv[1]
-    trademode = sys.argv[2].lower() if len(sys.argv) >= 3 else ""
-    # normalize common aliases
-    if trademode == "simplerepeat":
-        trademode = "simplerepeat"
-    elif trademode == "latency":
-        trademode = "latency"
-    elif trademode == "layer":
-        trademode = "layer"
-
+# cfg / trademode were parsed and checked against VALID_MODES at the top,
+# because the per-mode settings above depend on them.
 # SINGLE entrypoint call; do not call main() again below
 main(cfg, trademode)
\ No newline at end of file
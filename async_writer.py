@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# async_writer.py
+# Background, batched line writer for rpapp.log / latency.csv.
+#
+# The send and callback paths only do a non-blocking put onto a bounded queue;
+# a daemon thread keeps the file open and writes lines in batches, flushing once
+# batch_size lines are buffered or flush_interval_s has passed. If the queue is
+# full the line is dropped and counted rather than stalling the caller.
+import queue, threading, time
+from pathlib import Path
+
+_STOP = object()
+
+
+class BatchedWriter:
+    """Appends lines to a file from a background thread fed by a bounded queue."""
+
+    def __init__(self, path: Path, max_queue=100_000, batch_size=512, flush_interval_s=0.25):
+        self.path = Path(path)
+        self.batch_size = int(batch_size)
+        self.flush_interval_s = float(flush_interval_s)
+        self._q = queue.Queue(maxsize=max_queue)
+        self._drop_lock = threading.Lock()
+        self.dropped = 0
+        self.written = 0
+        self.batches = 0
+        self._closed = False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name=f"writer-{self.path.name}", daemon=True)
+        self._thread.start()
+
+    def write(self, line: str):
+        """Queues one line (newline added); never blocks."""
+        if self._closed:
+            return
+        try:
+            self._q.put_nowait(line)
+        except queue.Full:
+            with self._drop_lock:
+                self.dropped += 1
+
+    def close(self, timeout=5.0):
+        """Flushes everything queued so far and stops the thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._q.put(_STOP)
+        self._thread.join(timeout)
+
+    def summary_line(self, prefix="[WRITER]"):
+        return (f"{prefix} {self.path.name} written={self.written} batches={self.batches} "
+                f"dropped={self.dropped}")
+
+    def _run(self):
+        get, get_nowait = self._q.get, self._q.get_nowait
+        buf = []
+        last_flush = time.monotonic()
+        with self.path.open("a", encoding="utf-8") as f:
+            while True:
+                stop = False
+                try:
+                    item = get(timeout=self.flush_interval_s)
+                    if item is _STOP:
+                        stop = True
+                    else:
+                        buf.append(item)
+                        # drain whatever else is already queued, up to a batch
+                        while len(buf) < self.batch_size:
+                            item = get_nowait()
+                            if item is _STOP:
+                                stop = True
+                                break
+                            buf.append(item)
+                except queue.Empty:
+                    pass
+
+                now = time.monotonic()
+                if buf and (stop or len(buf) >= self.batch_size
+                            or now - last_flush >= self.flush_interval_s):
+                    f.write("\n".join(buf) + "\n")
+                    f.flush()
+                    self.written += len(buf)
+                    self.batches += 1
+                    buf.clear()
+                    last_flush = now
+                if stop:
+                    return
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# bench_order_book.py
+# Microbenchmark: 35=X style updates per second into order_book.L2Book.
+# No session needed.
+#
+# The update stream is precomputed (random walk around a mid price, mostly
+# changes near the top, some deletes of the best level so the top-of-book walk
+# gets exercised) so the timed loop is only apply + one top-of-book read.
+# The synthetic variant also keeps the merged YES/NO book and reads its top.
+#
+#   python3 bench_order_book.py [--n 1000000] [--seed 1]
+import argparse, random, time
+from array import array
+
+from order_book import BID, OFFER, CHANGE, DELETE, MAX_TICK, MIN_TICK, OrderBooks
+
+SYMBOL = "CBBTC_123125_132500"
+
+
+def make_updates(n, seed):
+    rng = random.Random(seed)
+    mid = 50
+    live = {BID: set(), OFFER: set()}
+    out = []
+    while len(out) < n:
+        if rng.random() < 0.05:
+            mid = min(max(mid + rng.choice((-1, 1)), MIN_TICK + 5), MAX_TICK - 5)
+            # levels the new mid crosses go away, as they would on a real feed
+            for et, crossed in ((BID, [t for t in live[BID] if t >= mid]),
+                                (OFFER, [t for t in live[OFFER] if t <= mid])):
+                for t in crossed:
+                    live[et].discard(t)
+                    out.append((DELETE, et, f"0.{t:02d}", 0))
+        bid = rng.random() < 0.5
+        off = int(rng.expovariate(0.5))               # mostly within a few ticks of the top
+        tick = mid - 1 - off if bid else mid + 1 + off
+        tick = min(max(tick, MIN_TICK), MAX_TICK)
+        et = BID if bid else OFFER
+        act = DELETE if rng.random() < 0.2 else CHANGE
+        (live[et].discard if act == DELETE else live[et].add)(tick)
+        out.append((act, et, f"0.{tick:02d}", rng.randint(1, 500)))
+    return out[:n]
+
+
+def run(label, books, updates, depth, synthetic=False):
+    apply = books.apply_update
+    ticks, sizes = array("q", bytes(8 * 10)), array("q", bytes(8 * 10))
+    book = books.synthetic(SYMBOL) if synthetic else books.get(SYMBOL, "YES")
+    t0 = time.perf_counter()
+    if depth:
+        for act, et, px, sz in updates:
+            apply(SYMBOL, "YES", act, et, px, sz)
+            book.depth_into(BID, ticks, sizes, 5)
+    else:
+        for act, et, px, sz in updates:
+            apply(SYMBOL, "YES", act, et, px, sz)
+            book.best_bid()
+    secs = time.perf_counter() - t0
+    n = len(updates)
+    print(f"[BENCH] {label:<22} n={n}  {secs:.3f}s  {n / secs:,.0f} updates/sec  {secs / n * 1e6:.2f} us/update")
+    print(book.top_line())
+
+
+def main():
+    ap = argparse.ArgumentParser(description="L2 order book update throughput")
+    ap.add_argument("--n", type=int, default=1_000_000, help="updates per variant")
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    updates = make_updates(args.n, args.seed)
+    run("update + best bid", OrderBooks(), updates, depth=False)
+    run("update + 5-level depth", OrderBooks(), updates, depth=True)
+    run("update + synthetic bid", OrderBooks(synthetic=True), updates, depth=False, synthetic=True)
+
+
+if __name__ == "__main__":
+    main()
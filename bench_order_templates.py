@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# bench_order_templates.py
+# Microbenchmark: NewOrderSingle construction, per-order build vs NosTemplate.
+# No session needed - this only builds (and optionally serializes) messages.
+#
+#   python3 bench_order_templates.py [--n 200000] [--wire]
+#
+# quickfix 1.16.0 (pip source build), Python 3.11, n=200000, one run each:
+#                          build only          --wire (toString too)
+#   build each time        16,008/s  62.5us    15,343/s  65.2us
+#   template, float px    106,862/s   9.4us    76,379/s  13.1us   (x6.7 / x5.0)
+#   template, string px   130,199/s   7.7us    88,255/s  11.3us   (x8.1 / x5.8)
+# The template and per-order messages serialize to the same fields apart from 11/60.
+import argparse, itertools, time
+import quickfix as fix
+import quickfix50sp2 as fix50sp2
+
+from order_templates import NosTemplate
+
+SYMBOL  = "CBBTC_123125_132500"
+ACCOUNT = "yesTippy"
+PRICES  = [0.52, 0.53, 0.54, 0.55]
+_seq    = itertools.count(1)   # same ClOrdID cost in every variant; only construction differs
+
+def build_each_time(i):
+    # what App.send_limit did before templates: new message + every field, every order
+    nos = fix50sp2.NewOrderSingle()
+    nos.setField(fix.ClOrdID("CL-" + str(next(_seq))))                  # 11
+    nos.setField(fix.Account(ACCOUNT))                                  # 1
+    nos.setField(fix.Symbol(SYMBOL))                                    # 55
+    nos.setField(fix.Side(fix.Side_BUY))                                # 54
+    nos.setField(fix.TransactTime())                                    # 60
+    nos.setField(fix.OrdType(fix.OrdType_LIMIT))                        # 40=2
+    nos.setField(fix.OrderQty(float(1)))                                # 38
+    nos.setField(fix.Price(float(PRICES[i & 3])))                       # 44
+    nos.setField(fix.CustOrderCapacity(1))                              # 582
+    nos.setField(fix.AccountType(1))                                    # 581
+    nos.setField(fix.SecuritySubType("YES"))                            # 762
+    nos.setField(fix.TimeInForce(fix.TimeInForce_DAY))                  # 59
+    return nos
+
+def run(label, fn, n, wire):
+    # warm up so we measure steady state, not first-call costs
+    for i in range(min(1000, n)):
+        fn(i)
+    t0 = time.perf_counter()
+    if wire:
+        for i in range(n):
+            fn(i).toString()
+    else:
+        for i in range(n):
+            fn(i)
+    secs = time.perf_counter() - t0
+    rate = n / secs if secs > 0 else 0.0
+    print(f"[BENCH] {label:<22} n={n}  {secs:.3f}s  {rate:,.0f} orders/sec  {secs / n * 1e6:.2f} us/order")
+    return rate
+
+def main():
+    ap = argparse.ArgumentParser(description="NewOrderSingle build cost: per-order vs template")
+    ap.add_argument("--n", type=int, default=200_000, help="orders per variant")
+    ap.add_argument("--wire", action="store_true", help="also serialize each message (toString)")
+    args = ap.parse_args()
+
+    tmpl = NosTemplate(SYMBOL, "YES", 1, ACCOUNT, True, fix.TimeInForce_DAY)
+    price_strs = [f"{p:.2f}" for p in PRICES]
+
+    before = run("build each time", build_each_time, args.n, args.wire)
+    after_f = run("template, float px", lambda i: tmpl.build("CL-" + str(next(_seq)), PRICES[i & 3]),
+                  args.n, args.wire)
+    after_s = run("template, string px", lambda i: tmpl.build("CL-" + str(next(_seq)), price_strs[i & 3]),
+                  args.n, args.wire)
+    print(f"[BENCH] speedup: float px x{after_f / before:.2f}   string px x{after_s / before:.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# bulk_cancel.py
+# Cancel every resting order from a run over ONE session, at a set rate.
+#
+# CancelOneOrder.py logs on, sends one 35=F and logs off; after a GTC layer run
+# with hundreds of resting orders that is hundreds of logons. This tool works out
+# which orders are still open - from the ExecReports in rpapp.log, or from a plain
+# list of ClOrdIDs - and sends all the cancels on one session with the open-loop
+# scheduler, then reports the cancel-ack latency distribution and sweep time.
+#
+#   python3 bulk_cancel.py config/sendOrder20251103.cfg --from-log /home/ec2-user/pythonQF/logs/rpapp.log --qps 50
+#   python3 bulk_cancel.py config/sendOrder20251103.cfg --clordids open.txt --symbol CBBTC_123125_132500 --side buy
+#
+# open.txt: one order per line, "clordid[,symbol[,side[,secsubtype[,account]]]]";
+# missing columns fall back to --symbol/--side/--security-subtype/--account.
+import argparse, re, sys, time
+from collections import namedtuple
+
+import quickfix as fix
+
+import FIXLatencyTester as flt
+from FIXLatencyTester import LatencyTracker, track_exec_report
+from async_writer import BatchedWriter
+from clordid_gen import ClOrdIdGen, run_prefix
+from order_scheduler import OpenLoopScheduler
+from order_templates import build_cancel
+from token_bucket import TokenBucket
+
+OpenOrder = namedtuple("OpenOrder", "clordid symbol buy sec_subtype account orderid qty")
+
+_FIELD_SPLIT = re.compile(r"[\x01|]")
+_OPEN_STATUS = {"0", "1", "5", "A", "E"}     # new, partially filled, replaced, pending new/replace
+_DONE_STATUS = {"2", "3", "4", "8", "C"}     # filled, done for day, canceled, rejected, expired
+
+
+def _fields(line):
+    out = {}
+    for f in _FIELD_SPLIT.split(line):
+        tag, eq, val = f.partition("=")
+        if eq and tag.strip().isdigit():
+            out.setdefault(tag.strip(), val)
+    return out
+
+
+def open_orders_from_log(path, prefix=None):
+    """Orders whose latest ExecReport in a messages log leaves them open.
+
+    A replace (ExecType 5) moves the order from 41 to its new 11. prefix limits
+    the result to ClOrdIDs starting with it (e.g. one run's ClOrdIdGen prefix).
+    """
+    live = {}
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if "35=8" not in line:
+                continue
+            fd = _fields(line)
+            if fd.get("35") != "8" or "11" not in fd:
+                continue
+            cl, status = fd["11"], fd.get("39", "")
+            if fd.get("150") == "5" and fd.get("41"):
+                live.pop(fd["41"], None)
+            if status in _DONE_STATUS:
+                live.pop(cl, None)
+                if fd.get("41"):
+                    live.pop(fd["41"], None)     # 8/4 for our cancel names the order in 41
+            elif status in _OPEN_STATUS:
+                live[cl] = OpenOrder(cl, fd.get("55", ""), fd.get("54", "1") == "1", fd.get("762"),
+                                     fd.get("1"), fd.get("37"), fd.get("151") or fd.get("38"))
+    return [o for cl, o in live.items() if prefix is None or cl.startswith(prefix)]
+
+
+def open_orders_from_list(path, symbol=None, side="buy", sec_subtype=None, account=None):
+    out = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            cols = [c.strip() for c in line.split(",")] + [None] * 4
+            cl, sym, sd, sst, acct = cols[:5]
+            sym = sym or symbol
+            if not sym:
+                sys.exit(f"no symbol for {cl}; add a column or pass --symbol")
+            out.append(OpenOrder(cl, sym, (sd or side).lower() in ("1", "buy", "b"),
+                                 sst or sec_subtype, acct or account, None, None))
+    return out
+
+
+class App(fix.Application):
+    def __init__(self, sender_sub_id, clgen, lat, rplog):
+        super().__init__()
+        self.session_id = None
+        self.sender_sub_id = sender_sub_id
+        self.clgen = clgen
+        self.lat = lat
+        self.rplog = rplog
+        self.acked = 0          # 8/4 for one of our cancels
+        self.rejected = 0       # 35=9 (too late to cancel, unknown order, ...)
+        self.throttle = None    # TokenBucket when --max-rate is set
+
+    # ---- lifecycle ----
+    def onCreate(self, sid): pass
+
+    def onLogon(self, sid):
+        print("[LOGON]", sid)
+        self.session_id = sid
+
+    def onLogout(self, sid):
+        print("[LOGOUT]", sid)
+
+    # ---- admin plumbing ----
+    def toAdmin(self, msg, sid):
+        mt = fix.MsgType(); msg.getHeader().getField(mt)
+        if mt.getValue() == fix.MsgType_Logon:
+            try: msg.getHeader().removeField(50)
+            except fix.FieldNotFound: pass
+            msg.setField(fix.EncryptMethod(0))       # 98=0 (None)
+            msg.setField(fix.HeartBtInt(30))         # 108=30
+            msg.setField(fix.DefaultApplVerID("9"))  # 1137=9 (FIX50SP2)
+            msg.setField(fix.ResetSeqNumFlag(True))  # 141=Y
+
+    def fromAdmin(self, msg, sid): pass
+
+    # ---- app plumbing ----
+    def toApp(self, msg, sid):
+        msg.getHeader().setField(fix.SenderSubID(self.sender_sub_id))
+        mt = fix.MsgType(); msg.getHeader().getField(mt)
+        if mt.getValue() == fix.MsgType_OrderCancelRequest:
+            cl = fix.ClOrdID(); msg.getField(cl)
+            self.lat.note_send(cl.getValue())
+
+    def fromApp(self, msg, sid):
+        self.rplog.write(msg.toString())
+        r = track_exec_report(self.lat, msg)
+        if r is None or self.clgen.key(r[1] or "") is None:
+            return
+        msgtype, _, _, exectype, _ = r
+        if msgtype == fix.MsgType_OrderCancelReject:
+            self.rejected += 1
+        elif exectype == "4":
+            self.acked += 1
+
+    def send_cancel(self, order: OpenOrder, intended_ns=None):
+        clid = self.clgen.next_id()
+        self.lat.note_intended(clid, intended_ns)
+        msg = build_cancel(clid, order.clordid, order.symbol, order.buy, order.sec_subtype,
+                           order.account, order.qty, order.orderid)
+        if self.throttle:
+            self.throttle.acquire()
+        ok = fix.Session.sendToTarget(msg, self.session_id)
+        if not ok:
+            self.lat.discard(clid)
+        self.rplog.write(f"[CXL] OrigClOrdID={order.clordid} NewClOrdID={clid} OK={ok}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Cancel many open orders over one FIX session.")
+    ap.add_argument("config", help="initiator cfg, e.g. config/sendOrder20251103.cfg")
+    src = ap.add_mutually_exclusive_group(required=True)
+    src.add_argument("--from-log", help="messages log with our ExecReports (e.g. rpapp.log)")
+    src.add_argument("--clordids", help="file of ClOrdIDs to cancel, one per line")
+    ap.add_argument("--prefix", help="only cancel ClOrdIDs starting with this (one run's prefix)")
+    ap.add_argument("--symbol", help="Symbol(55) for list entries without one")
+    ap.add_argument("--side", default="buy", help="buy/sell or 1/2 for list entries without one")
+    ap.add_argument("--security-subtype", help="SecuritySubType(762) for list entries without one")
+    ap.add_argument("--account", help="Account(1) for list entries without one")
+    ap.add_argument("--qps", type=float, default=50.0, help="cancel send rate")
+    ap.add_argument("--max-rate", type=float, default=0.0,
+                    help="venue message-rate limit (msgs/sec) enforced by a token bucket; 0 = off")
+    ap.add_argument("--burst", type=float, default=1.0, help="token-bucket burst with --max-rate")
+    ap.add_argument("--sub-id", default=flt.SENDER_SUB_ID, help="SenderSubID(50)")
+    ap.add_argument("--logon-timeout", type=float, default=10.0)
+    ap.add_argument("--drain-secs", type=float, default=10.0, help="max wait for cancel acks after the last send")
+    ap.add_argument("--dry-run", action="store_true", help="list what would be canceled and exit")
+    args = ap.parse_args()
+
+    if args.from_log:
+        orders = open_orders_from_log(args.from_log, args.prefix)
+    else:
+        orders = open_orders_from_list(args.clordids, args.symbol, args.side, args.security_subtype, args.account)
+        if args.prefix:
+            orders = [o for o in orders if o.clordid.startswith(args.prefix)]
+    print(f"[BULK] {len(orders)} open orders to cancel")
+    if args.dry_run or not orders:
+        for o in orders:
+            print(f"  {o.clordid} {o.symbol} {'BUY' if o.buy else 'SELL'} {o.sec_subtype or ''} {o.account or ''}")
+        return
+
+    # own counter file: the cancels' ClOrdIDs must not collide with a sender's
+    # own "X" prefix: this counter starts independently of the senders', so a shared
+    # "C" prefix could repeat a live order's ClOrdID
+    clgen = ClOrdIdGen(flt.CLSEQ_FILE.with_name("clseq.cxl.dat"), prefix=run_prefix("X"))
+    lat = LatencyTracker(flt.data_dir / "cancel_latency.csv", clgen.prefix, capacity=max(1024, len(orders)))
+    rplog = BatchedWriter(flt.rplog_file)
+    settings = fix.SessionSettings(args.config)
+    app = App(args.sub_id, clgen, lat, rplog)
+    if args.max_rate > 0:
+        app.throttle = TokenBucket(args.max_rate, args.burst)
+    init = fix.SocketInitiator(app, fix.FileStoreFactory(settings), settings, fix.FileLogFactory(settings))
+    init.start()
+    try:
+        t0 = time.time()
+        while app.session_id is None and time.time() - t0 < args.logon_timeout:
+            time.sleep(0.05)
+        if app.session_id is None:
+            print(f"ERROR: no logon within {args.logon_timeout}s; nothing sent")
+            return
+
+        sched = OpenLoopScheduler(args.qps, max_orders=len(orders))
+        start_ns = time.perf_counter_ns()
+        sched.run(lambda i, planned_ns: app.send_cancel(orders[i], intended_ns=planned_ns))
+        t0 = time.time()
+        while lat.summary().get("pending", 0) > 0 and time.time() - t0 < args.drain_secs:
+            time.sleep(0.05)
+        sweep_s = (time.perf_counter_ns() - start_ns) / 1e9
+
+        print(sched.summary_line(prefix="[SCHED]"))
+        print(lat.summary_line(prefix="[CXL-ACK]"))
+        print(f"[BULK] cancels sent={sched.sent} acked(8/4)={app.acked} rejected(35=9)={app.rejected} "
+              f"unanswered={sched.sent - app.acked - app.rejected}  sweep={sweep_s:.3f}s")
+        if app.throttle:
+            print(app.throttle.summary_line())
+    except KeyboardInterrupt:
+        print("[BULK] interrupted")
+        print(lat.summary_line(prefix="[CXL-ACK]"))
+    finally:
+        init.stop()
+        rplog.close()
+        lat.close()
+        clgen.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# clordid_gen.py
+# Compact, monotonic ClOrdID generator (Python take on ClOrdIdGen in old/LoadInitiator.java).
+#
+# ClOrdID = run prefix + counter, e.g. "CT3K9ZQ-100001". The counter never goes
+# backwards across runs: before handing out ids from a new block we write the
+# block's end to the state file (tmp + fsync + rename), so after a crash the
+# next run starts past anything we could have sent. A clean close() writes the
+# exact next counter so normal restarts don't leave a gap.
+#
+# One state file per sending process - two processes sharing a file would
+# reserve overlapping blocks. Separate files also mean separate counters that
+# start at the same value, so every concurrent sender (load_fanout workers, the
+# bulk canceller) needs its own prefix as well; see run_prefix().
+import os, threading, time
+from itertools import count
+from pathlib import Path
+
+_DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def base36(n: int) -> str:
+    out = ""
+    while True:
+        n, r = divmod(n, 36)
+        out = _DIGITS[r] + out
+        if n == 0:
+            return out
+
+
+def run_prefix(kind: str = "C") -> str:
+    """kind + base36(now) + "-", e.g. "CT3K9ZQ-". Only unique per second: senders
+    started together must add their own part (load_fanout uses base + "w{idx}-")."""
+    return kind + base36(int(time.time())) + "-"
+
+
+class ClOrdIdGen:
+    """Hands out (counter, clordid) pairs; counters are reserved on disk in blocks."""
+
+    def __init__(self, state_path: Path, prefix: str = None, block: int = 10_000):
+        if block <= 0:
+            raise ValueError("block must be > 0")
+        self.state_path = Path(state_path)
+        self.block = int(block)
+        # run prefix: lets people (and the tracker) tell this run's ids from older ones
+        self.prefix = prefix if prefix is not None else run_prefix()
+        self._lock = threading.Lock()
+        self.first = self._load()
+        self._limit = self.first          # counters < _limit are reserved on disk
+        self._count = count(self.first)
+        self._last = self.first - 1
+        self._closed = False
+        self._reserve(self.first)
+
+    def _load(self) -> int:
+        try:
+            return int(self.state_path.read_text(encoding="utf-8").strip())
+        except FileNotFoundError:
+            return 1
+        except ValueError:
+            raise ValueError(f"corrupt ClOrdID state file {self.state_path}; fix or remove it")
+
+    def _save(self, value: int):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_name(self.state_path.name + ".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            f.write(f"{value}\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.state_path)
+
+    def _reserve(self, n: int):
+        # called with n >= _limit; reserve the block that contains n
+        while n >= self._limit:
+            self._limit += self.block
+        self._save(self._limit)
+
+    def next(self):
+        """(counter, clordid) for the next order."""
+        n = next(self._count)
+        if n >= self._limit:
+            with self._lock:
+                if n >= self._limit:
+                    self._reserve(n)
+        self._last = n
+        return n, self.prefix + str(n)
+
+    def next_id(self) -> str:
+        return self.next()[1]
+
+    def key(self, clordid: str):
+        """Counter for one of this run's ClOrdIDs, else None."""
+        if not clordid.startswith(self.prefix):
+            return None
+        try:
+            return int(clordid[len(self.prefix):])
+        except ValueError:
+            return None
+
+    def close(self):
+        """Persists the exact next counter; call on clean shutdown."""
+        if self._closed:
+            return
+        self._closed = True
+        with self._lock:
+            self._save(max(self._last + 1, self.first))
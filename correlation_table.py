@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# correlation_table.py
+# Bounded send-time table for ClOrdID -> ExecReport correlation.
+#
+# Orders are keyed by their integer sequence number (the counter part of the
+# ClOrdID), and seq % capacity picks a slot in preallocated arrays, so memory
+# is fixed no matter how long the run is. Entries leave the table when their
+# first ER arrives, when they are older than timeout_s (no response), or when a
+# newer order needs the slot while they are still waiting (also no response).
+# Each entry can carry a small int tag (e.g. the order-mix combination it came
+# from) so the ER side can attribute its latency.
+from array import array
+
+EMPTY = -1
+NO_TAG = -1
+
+
+class CorrelationTable:
+    """Fixed-capacity seq -> (sent_ns, intended_ns) table with time-based eviction."""
+
+    def __init__(self, capacity=65536, timeout_s=30.0):
+        if capacity <= 0:
+            raise ValueError("capacity must be > 0")
+        self.capacity = int(capacity)
+        self.timeout_ns = int(timeout_s * 1_000_000_000)
+        self._seq = array("q", [EMPTY]) * self.capacity
+        self._sent_ns = array("q", bytes(8 * self.capacity))
+        self._intended_ns = array("q", bytes(8 * self.capacity))
+        self._tag = array("h", [NO_TAG]) * self.capacity
+        self._oldest = 0          # lowest seq that may still be live
+        self._highest = -1        # highest seq ever claimed
+        self.live = 0
+        self.timed_out = 0        # evicted after timeout_s without an ER
+        self.overwritten = 0      # evicted because the ring wrapped onto them
+
+    @property
+    def no_response(self):
+        return self.timed_out + self.overwritten
+
+    def _claim(self, seq):
+        slot = seq % self.capacity
+        cur = self._seq[slot]
+        if cur != seq:
+            if cur != EMPTY:
+                self.overwritten += 1
+                self.live -= 1
+            self._seq[slot] = seq
+            self._sent_ns[slot] = 0
+            self._intended_ns[slot] = 0
+            self._tag[slot] = NO_TAG
+            self.live += 1
+            if seq > self._highest:
+                self._highest = seq
+        return slot
+
+    def set_intended(self, seq, intended_ns, tag=NO_TAG):
+        slot = self._claim(seq)
+        self._intended_ns[slot] = intended_ns
+        if tag != NO_TAG:
+            self._tag[slot] = tag
+
+    def set_sent(self, seq, sent_ns):
+        self._sent_ns[self._claim(seq)] = sent_ns
+
+    def tag(self, seq):
+        """Tag of a live seq; NO_TAG if untagged/unknown/evicted."""
+        slot = seq % self.capacity
+        return self._tag[slot] if self._seq[slot] == seq else NO_TAG
+
+    def pop(self, seq):
+        """(sent_ns, intended_ns) for a live seq, removing it; None if unknown/evicted."""
+        slot = seq % self.capacity
+        if self._seq[slot] != seq:
+            return None
+        self._seq[slot] = EMPTY
+        self.live -= 1
+        return self._sent_ns[slot], self._intended_ns[slot]
+
+    def expire(self, now_ns):
+        """Evicts entries older than the timeout; returns how many were evicted.
+
+        Seqs are handed out in send order, so we only walk forward from the
+        oldest live seq and stop at the first entry that is still in time.
+        """
+        expired = 0
+        cap = self.capacity
+        # anything more than one ring behind the newest seq can't be live any more
+        lowest = max(self._oldest, self._highest - cap + 1)
+        while lowest <= self._highest:
+            slot = lowest % cap
+            if self._seq[slot] == lowest:
+                t = self._sent_ns[slot] or self._intended_ns[slot]
+                if now_ns - t < self.timeout_ns:
+                    break
+                self._seq[slot] = EMPTY
+                self.live -= 1
+                self.timed_out += 1
+                expired += 1
+            lowest += 1
+        self._oldest = lowest
+        return expired
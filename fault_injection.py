@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# fault_injection.py
+# Scriptable venue faults for venue_simulator.py.
+#
+#   drop          probability an outgoing ExecReport / 35=9 is never sent
+#   spike         probability an outgoing message is held back spike_us extra
+#                 (the outbox keeps order, so everything behind it waits too)
+#   reject        probability an incoming 35=D/F/G gets a session-level 35=3
+#                 Reject instead of being processed
+#   logout_after  venue logs the session out after this many app messages
+#                 (counted per logon; 0 = never)
+#   gap           probability the next outgoing message skips gap_size sequence
+#                 numbers, which makes the initiator send a ResendRequest
+#
+# Settings come from the command line ("drop=0.01,spike=0.001,spike_us=50000")
+# and/or a script that changes them over the run, one phase per line:
+#
+#   # at_s  settings
+#   0       drop=0
+#   10      drop=0.05 spike=0.01 spike_us=20000
+#   30      logout_after=1000
+#   60      drop=0 spike=0 logout_after=0
+#
+# Every decision draws from one seeded Random, so a run can be repeated.
+import random, time
+
+NS = 1_000_000_000
+
+_KNOBS = {"drop": float, "spike": float, "spike_us": float, "reject": float,
+          "logout_after": int, "gap": float, "gap_size": int}
+
+
+def parse_settings(text):
+    """"drop=0.01,spike_us=5000" (commas or spaces) -> {"drop": 0.01, "spike_us": 5000.0}."""
+    out = {}
+    for item in text.replace(",", " ").split():
+        key, eq, val = item.partition("=")
+        if not eq or key not in _KNOBS:
+            raise ValueError(f"bad fault setting {item!r}; known: {', '.join(_KNOBS)}")
+        out[key] = _KNOBS[key](val)
+    return out
+
+
+def load_script(path):
+    """[(at_ns, {settings}), ...] sorted by time."""
+    phases = []
+    with open(path, encoding="utf-8") as f:
+        for n, line in enumerate(f, 1):
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            at, _, rest = line.partition(" ")
+            try:
+                phases.append((int(float(at) * NS), parse_settings(rest)))
+            except ValueError as e:
+                raise ValueError(f"{path}:{n}: {e}") from None
+    phases.sort(key=lambda p: p[0])
+    return phases
+
+
+class FaultPlan:
+    """Current fault settings plus the dice; call start() when the venue starts listening."""
+
+    def __init__(self, seed=None, script=None, **settings):
+        self.drop = 0.0
+        self.spike = 0.0
+        self.spike_us = 50_000.0
+        self.reject = 0.0
+        self.logout_after = 0
+        self.gap = 0.0
+        self.gap_size = 1
+        self.apply(settings)
+        self._rng = random.Random(seed)
+        self._phases = list(script or ())
+        self._scripted = bool(self._phases)
+        self._t0 = 0
+        self._next_at = None
+        # what was actually injected
+        self.dropped = 0
+        self.spiked = 0
+        self.rejected = 0
+        self.logouts = 0
+        self.gaps = 0
+        self.skipped_seqnums = 0
+
+    def apply(self, settings):
+        for k, v in settings.items():
+            setattr(self, k, v)
+
+    @property
+    def active(self):
+        return bool(self._scripted or self.drop or self.spike or self.reject or self.logout_after or self.gap)
+
+    @property
+    def may_delay(self):
+        """True if any spike can happen in this run (the outbox then needs its thread)."""
+        return bool(self.spike) or any("spike" in s for _, s in self._phases)
+
+    def start(self):
+        self._t0 = time.perf_counter_ns()
+        self._next_at = self._phases[0][0] if self._phases else None
+        self.tick()
+
+    def tick(self):
+        """Applies every script phase that is due; call it from one thread, every ~100ms."""
+        if self._next_at is None or time.perf_counter_ns() - self._t0 < self._next_at:
+            return
+        now = time.perf_counter_ns() - self._t0
+        while self._phases and self._phases[0][0] <= now:
+            at, settings = self._phases.pop(0)
+            self.apply(settings)
+            print(f"[FAULT] t={at / NS:g}s {' '.join(f'{k}={v:g}' for k, v in settings.items())}")
+        self._next_at = self._phases[0][0] if self._phases else None
+
+    # ---- decisions (each one counts what it injects) ----
+    def drop_now(self):
+        if self.drop and self._rng.random() < self.drop:
+            self.dropped += 1
+            return True
+        return False
+
+    def spike_ns(self):
+        if self.spike and self._rng.random() < self.spike:
+            self.spiked += 1
+            return int(self.spike_us * 1000)
+        return 0
+
+    def reject_now(self):
+        if self.reject and self._rng.random() < self.reject:
+            self.rejected += 1
+            return True
+        return False
+
+    def logout_now(self, app_msgs):
+        if self.logout_after and app_msgs >= self.logout_after:
+            self.logouts += 1
+            return True
+        return False
+
+    def gap_now(self):
+        """Sequence numbers to skip before the next outgoing message (0 = none)."""
+        if self.gap and self._rng.random() < self.gap:
+            self.gaps += 1
+            self.skipped_seqnums += self.gap_size
+            return self.gap_size
+        return 0
+
+    def summary_line(self, prefix="[FAULT]"):
+        return (f"{prefix} dropped={self.dropped} spiked={self.spiked} rejected(35=3)={self.rejected} "
+                f"logouts={self.logouts} gaps={self.gaps} (seqnums skipped={self.skipped_seqnums})")
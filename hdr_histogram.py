@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# hdr_histogram.py
+# Fixed-memory log-linear latency histogram (HdrHistogram layout, stdlib only).
+#
+# Values are integer microseconds. The first 2*half buckets are 1us wide; after
+# that every power of two is split into `half` equal buckets, so the relative
+# error stays under 1/half (0.8% with the default 8 bits) from 1us up to the
+# top of the range. record() is O(1), memory is a few thousand counters no
+# matter how many samples, and two histograms with the same layout can merge.
+from array import array
+
+
+class LogLinearHistogram:
+    """Log-linear histogram of integer microsecond values."""
+
+    def __init__(self, highest_us=3_600_000_000, sub_bucket_bits=8):
+        if highest_us < 2:
+            raise ValueError("highest_us must be >= 2")
+        self.highest_us = int(highest_us)
+        self.sub_bucket_bits = int(sub_bucket_bits)
+        self._sub_count = 1 << self.sub_bucket_bits
+        self._half = self._sub_count >> 1
+        self._counts = array("q", bytes(8 * (self._index(self.highest_us) + 1)))
+        self.reset()
+
+    def reset(self):
+        for i in range(len(self._counts)):
+            self._counts[i] = 0
+        self.total_count = 0
+        self.overflow = 0          # samples above highest_us (counted in the top bucket)
+        self._sum = 0
+        self.min = 0
+        self.max = 0
+
+    # ---- layout ----
+    def _index(self, v):
+        if v < self._sub_count:
+            return v
+        shift = v.bit_length() - self.sub_bucket_bits
+        return shift * self._half + (v >> shift)
+
+    def _bucket_bounds(self, idx):
+        """(lowest, highest) value that lands in bucket idx."""
+        if idx < self._sub_count:
+            return idx, idx
+        shift = idx // self._half - 1
+        sub = idx - shift * self._half
+        return sub << shift, ((sub + 1) << shift) - 1
+
+    def same_layout(self, other):
+        return (self.highest_us == other.highest_us
+                and self.sub_bucket_bits == other.sub_bucket_bits)
+
+    # ---- recording ----
+    def record(self, value_us, count=1):
+        v = int(value_us)
+        if v < 0:
+            v = 0
+        if v > self.highest_us:
+            self.overflow += count
+            idx = len(self._counts) - 1
+        else:
+            idx = self._index(v)
+        self._counts[idx] += count
+        if self.total_count == 0 or v < self.min:
+            self.min = v
+        if v > self.max:
+            self.max = v
+        self.total_count += count
+        self._sum += v * count
+
+    def merge(self, other):
+        """Adds other's samples into self (layouts must match)."""
+        if not self.same_layout(other):
+            raise ValueError("cannot merge histograms with different layouts")
+        if other.total_count == 0:
+            return self
+        counts = self._counts
+        for i, c in enumerate(other._counts):
+            if c:
+                counts[i] += c
+        if self.total_count == 0 or other.min < self.min:
+            self.min = other.min
+        if other.max > self.max:
+            self.max = other.max
+        self.total_count += other.total_count
+        self.overflow += other.overflow
+        self._sum += other._sum
+        return self
+
+    def to_dict(self):
+        """Plain-data form (sparse counts) for pickling/JSON between processes."""
+        return {
+            "highest_us": self.highest_us,
+            "sub_bucket_bits": self.sub_bucket_bits,
+            "counts": {i: c for i, c in enumerate(self._counts) if c},
+            "total_count": self.total_count,
+            "overflow": self.overflow,
+            "sum": self._sum,
+            "min": self.min,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        h = cls(d["highest_us"], d["sub_bucket_bits"])
+        for i, c in d["counts"].items():
+            h._counts[int(i)] = c
+        h.total_count = d["total_count"]
+        h.overflow = d["overflow"]
+        h._sum = d["sum"]
+        h.min = d["min"]
+        h.max = d["max"]
+        return h
+
+    def copy(self):
+        h = LogLinearHistogram(self.highest_us, self.sub_bucket_bits)
+        return h.merge(self)
+
+    # ---- queries ----
+    @property
+    def mean(self):
+        return self._sum / self.total_count if self.total_count else 0.0
+
+    def value_at_percentile(self, pct):
+        """Highest value equivalent to the sample at pct (0..100); 0 if empty."""
+        if self.total_count == 0:
+            return 0
+        pct = min(max(pct, 0.0), 100.0)
+        if pct == 100.0:
+            return self.max
+        # rank of the sample we want, 1-based, at least the first sample
+        want = max(1, int(pct / 100.0 * self.total_count + 0.5))
+        seen = 0
+        for idx, c in enumerate(self._counts):
+            if c:
+                seen += c
+                if seen >= want:
+                    hi = self._bucket_bounds(idx)[1]
+                    return min(hi, self.max)
+        return self.max
+
+    def percentiles(self, pcts=(50, 90, 99, 99.9)):
+        """{pct: value} for several percentiles in a single pass over the buckets."""
+        out = {}
+        if self.total_count == 0:
+            return {p: 0 for p in pcts}
+        wanted = sorted((max(1, int(min(max(p, 0.0), 100.0) / 100.0 * self.total_count + 0.5)), p)
+                        for p in pcts)
+        k = 0
+        seen = 0
+        for idx, c in enumerate(self._counts):
+            if not c:
+                continue
+            seen += c
+            while k < len(wanted) and seen >= wanted[k][0]:
+                out[wanted[k][1]] = min(self._bucket_bounds(idx)[1], self.max)
+                k += 1
+            if k == len(wanted):
+                break
+        for _, p in wanted[k:]:
+            out[p] = self.max
+        return out
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# inflight_window.py
+# Max-in-flight window (backpressure) for the order senders.
+#
+# A slot is taken before each order goes out and given back when the tracker
+# sees the order's first ExecReport, or gives up on it (timeout / evicted).
+# When the window is full the sender either blocks until a slot frees up or
+# skips the order. Occupancy is sampled on every send so the report shows how
+# full the window actually ran.
+import threading, time
+
+from hdr_histogram import LogLinearHistogram
+
+
+class InFlightWindow:
+    """Counting window of un-acked orders with block/skip policy and occupancy stats."""
+
+    def __init__(self, max_in_flight: int, policy="block", max_block_s=None, poll_s=0.05):
+        if max_in_flight <= 0:
+            raise ValueError("max_in_flight must be > 0")
+        if policy not in ("block", "skip"):
+            raise ValueError("policy must be 'block' or 'skip'")
+        self.max_in_flight = int(max_in_flight)
+        self.policy = policy
+        self.max_block_s = max_block_s     # block policy: give up (skip) after this long; None = forever
+        self.poll_s = poll_s
+        self.on_wait = None                # called while blocked, e.g. tracker.expire to free timed-out slots
+        self._cond = threading.Condition()
+        self.in_flight = 0
+        self.occupancy = LogLinearHistogram(highest_us=max(2, self.max_in_flight))   # in-flight count at each send
+        self.full_hits = 0                 # sends that found the window full
+        self.skipped = 0
+        self.blocked_ns = 0
+
+    def acquire(self) -> bool:
+        """Takes a slot; False if the order should be skipped."""
+        with self._cond:
+            if self.in_flight >= self.max_in_flight:
+                self.full_hits += 1
+                if self.policy == "skip":
+                    self.skipped += 1
+                    return False
+                t0 = time.perf_counter_ns()
+                deadline = None if self.max_block_s is None else t0 + int(self.max_block_s * 1e9)
+                while self.in_flight >= self.max_in_flight:
+                    if deadline is not None and time.perf_counter_ns() >= deadline:
+                        self.blocked_ns += time.perf_counter_ns() - t0
+                        self.skipped += 1
+                        return False
+                    self._cond.wait(self.poll_s)
+                    if self.in_flight >= self.max_in_flight and self.on_wait:
+                        # let the tracker expire dead orders; drop our lock so release() can run
+                        self._cond.release()
+                        try:
+                            self.on_wait()
+                        finally:
+                            self._cond.acquire()
+                self.blocked_ns += time.perf_counter_ns() - t0
+            self.in_flight += 1
+            self.occupancy.record(self.in_flight)
+            return True
+
+    def release(self, n: int = 1):
+        if n <= 0:
+            return
+        with self._cond:
+            self.in_flight = max(0, self.in_flight - n)
+            self._cond.notify(n)
+
+    def summary(self):
+        o = self.occupancy
+        p = o.percentiles((50, 99))
+        return {"max_in_flight": self.max_in_flight, "policy": self.policy, "in_flight": self.in_flight,
+                "sends": o.total_count, "occ_mean": o.mean, "occ_p50": p[50], "occ_p99": p[99],
+                "occ_max": o.max, "full_hits": self.full_hits, "skipped": self.skipped,
+                "blocked_ms": self.blocked_ns / 1e6}
+
+    def summary_line(self, prefix="[WINDOW]"):
+        s = self.summary()
+        return (f"{prefix} max={s['max_in_flight']} ({s['policy']}) sends={s['sends']}  "
+                f"occupancy mean={s['occ_mean']:.1f} p50={s['occ_p50']} p99={s['occ_p99']} max={s['occ_max']}  "
+                f"full={s['full_hits']} skipped={s['skipped']} blocked={s['blocked_ms']:.1f}ms "
+                f"now={s['in_flight']}")
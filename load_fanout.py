@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# load_fanout.py
+# Multi-process load launcher: N worker processes, one FIX session each.
+#
+# One process with one SocketInitiator shares the GIL with QuickFIX's callback
+# threads and tops out well below the venue. This launcher writes a cfg per
+# worker (from e.g. config/sendOrder20251103.cfg) with its own SenderCompID,
+# SenderSubID and store/log dirs, starts each worker with its share of the
+# target rate, then merges the workers' latency histograms and counters.
+#
+#   python3 load_fanout.py config/sendOrder20251103.cfg --workers 4 --qps 400 --orders 20000 \
+#       --comp-ids 4C001,4C002,4C003,4C004 --sub-ids 4C001,4C002,4C003,4C004
+import argparse, multiprocessing as mp, queue, re, sys, time
+from pathlib import Path
+
+from clordid_gen import run_prefix
+
+OUT_DIR = Path(__file__).resolve().parent / "config" / "fanout"   # generated cfgs (git-ignored)
+
+
+# ===== per-worker cfg =====
+def _set_keys(lines, section, values):
+    """Sets key=value inside [section]; appends keys the section doesn't have yet."""
+    out, in_sec, pending = [], False, dict(values)
+
+    def flush():
+        for k, v in pending.items():
+            out.append(f"{k}={v}")
+        pending.clear()
+
+    for line in lines:
+        m = re.match(r"\s*\[(\w+)\]", line)
+        if m:
+            if in_sec:
+                flush()
+            in_sec = m.group(1).upper() == section
+            out.append(line)
+            continue
+        key = line.split("=", 1)[0].strip() if "=" in line and not line.lstrip().startswith("#") else None
+        if in_sec and key in values:
+            out.append(f"{key}={values[key]}")
+            pending.pop(key, None)
+        else:
+            out.append(line)
+    if in_sec:
+        flush()
+    return out
+
+
+def read_key(cfg_text, section, key):
+    in_sec = False
+    for line in cfg_text.splitlines():
+        m = re.match(r"\s*\[(\w+)\]", line)
+        if m:
+            in_sec = m.group(1).upper() == section
+        elif in_sec and not line.lstrip().startswith("#") and "=" in line:
+            k, v = line.split("=", 1)
+            if k.strip() == key:
+                return v.strip()
+    return None
+
+
+def make_worker_cfgs(template: Path, n, comp_ids, sub_ids, out_dir: Path = OUT_DIR):
+    text = template.read_text(encoding="utf-8")
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for i in range(n):
+        lines = text.splitlines()
+        # separate store/log dirs: two sessions must never share seqnum files
+        lines = _set_keys(lines, "DEFAULT", {"FileStorePath": f"store/w{i}", "FileLogPath": f"logs/w{i}"})
+        # SenderSubID isn't a QuickFIX session key; the worker reads it back and puts it in tag 50
+        lines = _set_keys(lines, "SESSION", {"SenderCompID": comp_ids[i], "SenderSubID": sub_ids[i]})
+        p = out_dir / f"{template.stem}.w{i}.cfg"
+        p.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        paths.append(p)
+    return paths
+
+
+def split_evenly(total, n):
+    base, extra = divmod(total, n)
+    return [base + (1 if i < extra else 0) for i in range(n)]
+
+
+# ===== worker process =====
+def worker(idx, cfg_path, qps, n_orders, logon_timeout, drain_secs, clordid_prefix, results):
+    import quickfix as fix
+    import FIXLatencyTester as flt
+    from order_scheduler import OpenLoopScheduler
+
+    sub_id = read_key(Path(cfg_path).read_text(encoding="utf-8"), "SESSION", "SenderSubID") or flt.SENDER_SUB_ID
+    settings = fix.SessionSettings(str(cfg_path))
+    app = flt.App(sender_sub_id=sub_id, file_tag=f".w{idx}", clordid_prefix=clordid_prefix)
+    init = fix.SocketInitiator(app, fix.FileStoreFactory(settings), settings, fix.FileLogFactory(settings))
+    init.start()
+    result = {"worker": idx, "sub_id": sub_id, "error": None}
+    try:
+        t0 = time.time()
+        while app.session_id is None and time.time() - t0 < logon_timeout:
+            time.sleep(0.05)
+        if app.session_id is None:
+            result["error"] = f"no logon within {logon_timeout}s"
+            return
+        sched = OpenLoopScheduler(qps, max_orders=n_orders)
+        sched.run(lambda i, planned_ns: app.send_gtc_limit(
+            flt.SYMBOL, flt.SIDE_BUY, flt.QTY, flt.PRICE, flt.SecSubType, flt.ACCOUNT, intended_ns=planned_ns))
+        result["sched"] = sched.summary()
+        # give the venue time to answer; stop early once nothing is pending
+        t0 = time.time()
+        while time.time() - t0 < drain_secs and app.lat.summary().get("pending", 0) > 0:
+            time.sleep(0.1)
+    except KeyboardInterrupt:
+        result["error"] = "interrupted"
+    finally:
+        result["lat"] = app.lat.export()
+        init.stop()
+        app.close_logs()
+        results.put(result)
+
+
+# ===== launcher =====
+def main():
+    ap = argparse.ArgumentParser(description="Fan order load out over N processes / FIX sessions.")
+    ap.add_argument("config", help="template initiator cfg, e.g. config/sendOrder20251103.cfg")
+    ap.add_argument("--workers", type=int, default=2)
+    ap.add_argument("--qps", type=float, required=True, help="total target orders/sec across all workers")
+    ap.add_argument("--orders", type=int, required=True, help="total orders across all workers")
+    ap.add_argument("--comp-ids", help="comma list of SenderCompID(49), one per worker (default: template's)")
+    ap.add_argument("--sub-ids", help="comma list of SenderSubID(50), one per worker (default: template's/4C001)")
+    ap.add_argument("--logon-timeout", type=float, default=10.0)
+    ap.add_argument("--drain-secs", type=float, default=5.0, help="max wait for ERs after the last send")
+    args = ap.parse_args()
+
+    n = args.workers
+    template = Path(args.config)
+    text = template.read_text(encoding="utf-8")
+
+    def per_worker(opt, default):
+        vals = opt.split(",") if opt else [default] * n
+        if len(vals) < n:
+            sys.exit(f"need {n} values, got {len(vals)}: {opt}")
+        return [v.strip() for v in vals[:n]]
+
+    comp_ids = per_worker(args.comp_ids, read_key(text, "SESSION", "SenderCompID"))
+    sub_ids = per_worker(args.sub_ids, read_key(text, "SESSION", "SenderSubID") or "4C001")
+    if len(set(comp_ids)) < n:
+        print("[WARN] workers share a SenderCompID; the venue may refuse duplicate logons", file=sys.stderr)
+
+    cfgs = make_worker_cfgs(template, n, comp_ids, sub_ids)
+    orders = split_evenly(args.orders, n)
+    ctx = mp.get_context("spawn")   # no fork: QuickFIX threads don't survive it
+    results = ctx.Queue()
+    # one run prefix for the whole fan-out plus the worker index: each worker's counter
+    # starts from its own state file, so the index is what keeps their ClOrdIDs apart
+    base = run_prefix()
+    procs = []
+    for i in range(n):
+        p = ctx.Process(target=worker, name=f"fanout-w{i}",
+                        args=(i, str(cfgs[i]), args.qps / n, orders[i], args.logon_timeout, args.drain_secs,
+                              f"{base}w{i}-", results))
+        p.start()
+        procs.append(p)
+        print(f"[FANOUT] worker {i}: {cfgs[i].name} 49={comp_ids[i]} 50={sub_ids[i]} "
+              f"qps={args.qps / n:.1f} orders={orders[i]} 11={base}w{i}-* pid={p.pid}")
+
+    collected = []
+    try:
+        while len(collected) < n:
+            try:
+                collected.append(results.get(timeout=1.0))
+            except queue.Empty:
+                if not any(p.is_alive() for p in procs):
+                    break
+    except KeyboardInterrupt:
+        print("[FANOUT] interrupted; collecting what the workers report")
+        deadline = time.time() + 10
+        while len(collected) < n and time.time() < deadline:
+            try:
+                collected.append(results.get(timeout=1.0))
+            except queue.Empty:
+                pass
+    for p in procs:
+        p.join(timeout=10)
+
+    from FIXLatencyTester import LatencyTracker   # imported late: the workers own the sessions
+    sent = 0
+    for r in sorted(collected, key=lambda r: r["worker"]):
+        s = r.get("sched", {})
+        sent += s.get("sent", 0)
+        tag = f"[W{r['worker']}]"
+        if r["error"]:
+            print(f"{tag} error: {r['error']}")
+        if s:
+            print(f"{tag} sent={s['sent']} actual={s.get('actual_qps', 0):.1f}/s "
+                  f"lag p99={s.get('lag_p99_us', 0):.1f}us late={s.get('late', 0)}")
+        print(LatencyTracker.format_line(LatencyTracker.merge_exports([r["lat"]]), prefix=tag))
+
+    print(f"[FANOUT] workers reporting {len(collected)}/{n}  total sent={sent}")
+    merged = LatencyTracker.merge_exports([r["lat"] for r in collected])
+    print(LatencyTracker.format_line(merged, prefix="[FANOUT]"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# low_jitter.py
+# Opt-in low-jitter mode for the measured window of a run.
+#
+#   with LowJitter(cpus={2, 3}) as lj:
+#       sched.run(send_one)
+#   print(lj.summary_line())
+#
+# On enter: one full collection, then gc.freeze() moves everything alive into the
+# permanent generation (never scanned again) and gc.disable() stops automatic
+# collections, so no GC pause can land on a send. The calling thread is pinned
+# to `cpus` (Linux sched_setaffinity works per thread when given 0) and can
+# optionally run SCHED_FIFO or at a better nice level; both usually need root /
+# CAP_SYS_NICE and are skipped with a warning when not allowed. Threads started
+# inside the block (e.g. the send_pipeline sender) inherit the pinning.
+# On exit everything is put back. Cyclic garbage is not freed while the GC is
+# off, so keep the block to the measured part of the run.
+#
+# gc.callbacks counts every collection that still happens inside the window
+# (explicit gc.collect() calls, or all of them with disable_gc=False) and how
+# long they took.
+#
+# Preallocation is the caller's part: build templates, ladders and schedules
+# before entering so the block only sends.
+import gc, os, sys, time
+
+
+class LowJitter:
+    """Context manager: gc freeze/disable, CPU pinning, optional realtime scheduling."""
+
+    def __init__(self, cpus=None, freeze_gc=True, disable_gc=True, rt_priority=None, nice=None):
+        self.cpus = set(cpus) if cpus else None
+        self.freeze_gc = freeze_gc
+        self.disable_gc = disable_gc
+        self.rt_priority = rt_priority      # SCHED_FIFO priority (1..99); None = leave policy alone
+        self.nice = nice                    # e.g. -10; None = leave alone
+        self.gc_collections = [0, 0, 0]     # per generation, inside the window
+        self.gc_pause_ns = 0
+        self.gc_max_pause_ns = 0
+        self.frozen = 0                     # objects moved to the permanent generation
+        self.notes = []                     # what was applied / skipped
+        self._gc_t0 = 0
+        self._saved = {}
+
+    # ---- gc.callbacks hook ----
+    def _on_gc(self, phase, info):
+        if phase == "start":
+            self._gc_t0 = time.perf_counter_ns()
+        else:
+            dt = time.perf_counter_ns() - self._gc_t0
+            self.gc_collections[info["generation"]] += 1
+            self.gc_pause_ns += dt
+            if dt > self.gc_max_pause_ns:
+                self.gc_max_pause_ns = dt
+
+    def __enter__(self):
+        self._saved["gc_enabled"] = gc.isenabled()
+        if self.freeze_gc:
+            gc.collect()
+            gc.freeze()
+            self.frozen = gc.get_freeze_count()
+            self.notes.append(f"gc.freeze({self.frozen})")
+        if self.disable_gc:
+            gc.disable()
+            self.notes.append("gc off")
+
+        if self.cpus is not None:
+            if hasattr(os, "sched_setaffinity"):
+                self._saved["affinity"] = os.sched_getaffinity(0)
+                try:
+                    os.sched_setaffinity(0, self.cpus)
+                    self.notes.append(f"cpus={sorted(self.cpus)}")
+                except OSError as e:
+                    self.notes.append(f"affinity skipped ({e})")
+                    print(f"[JITTER] CPU pinning not applied: {e}", file=sys.stderr)
+            else:
+                self.notes.append("affinity n/a on this OS")
+                print("[JITTER] CPU pinning not applied: no sched_setaffinity on this OS", file=sys.stderr)
+
+        if self.rt_priority is not None:
+            try:
+                self._saved["sched"] = (os.sched_getscheduler(0), os.sched_getparam(0))
+                os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(self.rt_priority))
+                self.notes.append(f"SCHED_FIFO {self.rt_priority}")
+            except (AttributeError, OSError) as e:
+                self._saved.pop("sched", None)
+                self.notes.append(f"SCHED_FIFO skipped ({e})")
+                print(f"[JITTER] SCHED_FIFO not applied: {e}", file=sys.stderr)
+
+        if self.nice is not None:
+            try:
+                self._saved["nice"] = os.getpriority(os.PRIO_PROCESS, 0)
+                os.setpriority(os.PRIO_PROCESS, 0, self.nice)
+                self.notes.append(f"nice {self.nice}")
+            except (AttributeError, OSError) as e:
+                self._saved.pop("nice", None)
+                self.notes.append(f"nice skipped ({e})")
+                print(f"[JITTER] nice not applied: {e}", file=sys.stderr)
+
+        gc.callbacks.append(self._on_gc)
+        return self
+
+    def __exit__(self, *exc):
+        gc.callbacks.remove(self._on_gc)
+        if "nice" in self._saved:
+            try:
+                os.setpriority(os.PRIO_PROCESS, 0, self._saved["nice"])
+            except OSError:
+                pass     # lowering nice back needs the same privilege; leave it
+        if "sched" in self._saved:
+            policy, param = self._saved["sched"]
+            os.sched_setscheduler(0, policy, param)
+        if "affinity" in self._saved:
+            os.sched_setaffinity(0, self._saved["affinity"])
+        if self.freeze_gc:
+            gc.unfreeze()
+        if self._saved.get("gc_enabled"):
+            gc.enable()
+        return False
+
+    @property
+    def gc_count(self):
+        return sum(self.gc_collections)
+
+    def summary_line(self, prefix="[JITTER]"):
+        g = self.gc_collections
+        return (f"{prefix} {', '.join(self.notes) or 'nothing applied'}  "
+                f"gc collections in window={self.gc_count} (gen0={g[0]} gen1={g[1]} gen2={g[2]}) "
+                f"pause total={self.gc_pause_ns / 1e6:.2f}ms max={self.gc_max_pause_ns / 1e6:.2f}ms")
@@ -4,6 +4,8 @@ import quickfix as fix
 import quickfix50sp2 as fix50sp2
 from pathlib import Path
 from datetime import datetime
+from token_bucket import TokenBucket
+from order_book import OrderBooks
 rpdir = Path("/home/ec2-user/pythonQF")
 
 cfg = sys.argv[1]
@@ -37,6 +39,8 @@ SYMBOL = "CBBTC_123125_132500"
 SecSubType = "YES"
 #SecSubType = "NO"
 SIDE_BUY = True  # set False for sell
+VENUE_MSG_RATE = 0   # app messages/sec the venue allows (orders + MD requests); 0 = fixed 10us sleep per order
+VENUE_BURST    = 1   # messages allowed back-to-back before the rate applies
 
 class App(fix.Application):
     def __init__(self):
@@ -49,6 +53,11 @@ class App(fix.Application):
         # --- market data tracking ---
         self._md_pending = {}   # MDReqID -> threading.Event()
         self._md_last = {}      # MDReqID -> dict(snapshot data)    
+        self._md_subs = {}      # MDReqID -> (55, 762) it was subscribed for
+        # L2 book per (55, 762), kept from W/X, plus the merged YES/NO book per 55 (order_book.py)
+        self.books = OrderBooks(synthetic=True)
+        # every app message (35=D, 35=V) takes a token first; see token_bucket.py
+        self.throttle = TokenBucket(VENUE_MSG_RATE, VENUE_BURST) if VENUE_MSG_RATE > 0 else None
         
     def onCreate(self, sid):
         print(f"[onCreate] Session created: {sid}")
@@ -175,6 +184,16 @@ class App(fix.Application):
                 # No 268 — some venues may send an empty snapshot header
                 pass
 
+            # 762 on the message, else whatever this 262 was subscribed for
+            sub_sym, secsub = self._md_subs.get(mdreqid, (symbol, ""))
+            try:
+                ss = fix.SecuritySubType(); msg.getField(ss)
+                secsub = ss.getValue()
+            except fix.FieldNotFound:
+                pass
+            l2 = self.books.apply_snapshot(symbol or sub_sym, secsub,
+                                           [(e.get("type"), e.get("px"), e.get("sz")) for e in book])
+
             snapshot = {"symbol": symbol, "entries": book, "raw": raw}
             if mdreqid:
                 self._md_last[mdreqid] = snapshot
@@ -185,6 +204,9 @@ class App(fix.Application):
 
             line = f"[MD SNAP] 35=W 262={mdreqid or 'NA'} 55={symbol or 'NA'} entries={len(book)}"
             print(line)
+            print(l2.top_line())
+            if l2.sec_subtype in ("YES", "NO"):
+                print(self.books.synthetic(l2.symbol).top_line())
             with rplog_file.open("a", encoding="utf-8") as f:
                 f.write(line + "\n")
 
@@ -226,12 +248,30 @@ class App(fix.Application):
                         upd["sym"] = sym.getValue()
                     except fix.FieldNotFound:
                         pass
+                    try:
+                        ss = fix.SecuritySubType(); grp.getField(ss)
+                        upd["sub"] = ss.getValue()
+                    except fix.FieldNotFound:
+                        pass
                     updates.append(upd)
             except fix.FieldNotFound:
                 pass
 
+            # apply to the L2 books; entries without 55/762 belong to what 262 subscribed
+            sub_sym, sub_secsub = self._md_subs.get(mdreqid, ("", ""))
+            touched = {}
+            for upd in updates:
+                l2 = self.books.apply_update(upd.get("sym", sub_sym), upd.get("sub", sub_secsub),
+                                             upd.get("act"), upd.get("type"), upd.get("px"), upd.get("sz"))
+                if l2 is not None:
+                    touched[(l2.symbol, l2.sec_subtype)] = l2
+
             line = f"[MD INC] 35=X 262={mdreqid or 'NA'} n={len(updates)}"
             print(line)
+            for l2 in touched.values():
+                print(l2.top_line())
+            for symbol in {k[0] for k in touched if k[1] in ("YES", "NO")}:
+                print(self.books.synthetic(symbol).top_line())
             with rplog_file.open("a", encoding="utf-8") as f:
                 f.write(line + " " + str(updates) + "\n")
 
@@ -292,6 +332,8 @@ class App(fix.Application):
 
         # Prefer the trading session if you have two sessions configured
         sid = getattr(self, "trade_session", None) or self.session_id
+        if self.throttle:
+            self.throttle.acquire()
         ok = fix.Session.sendToTarget(nos, sid)
 
         msg = f"[SEND] LIMIT {Symbol} {('BUY' if Buy else 'SELL')} {Qty} @ {Price} {SecSubType} (TIF=DAY) -> {ok} 11={clid}"
@@ -328,7 +370,10 @@ class App(fix.Application):
         rel.setField(fix.Symbol(Symbol))                      # 55
         rel.setField(fix.SecuritySubType(SecSubType))         # 762
         md.addGroup(rel)
+        self._md_subs[MDReqID] = (Symbol, SecSubType)
 
+        if self.throttle:
+            self.throttle.acquire()
         ok = fix.Session.sendToTarget(md, self.md_session)
         print(f"[SEND MD SUB] 35=V 263=1 262={MDReqID} 55={Symbol} 762={SecSubType} -> {ok}")
         with rplog_file.open("a", encoding="utf-8") as f:
@@ -340,6 +385,8 @@ class App(fix.Application):
         md.setField(fix.MDReqID(mdreqid))                 # 262
         md.setField(fix.SubscriptionRequestType('2'))     # 263=2 unsubscribe
         # spec requires 267/146 to match original in some venues; include them if EP3 requires
+        if self.throttle:
+            self.throttle.acquire()
         ok = fix.Session.sendToTarget(md, self.session_id)
         print(f"[SEND MD UNSUB] 262={mdreqid} -> {ok}")	
 
@@ -428,8 +475,10 @@ def main(cfg, trademode):
             elapsed = (time.perf_counter() - start) * 1000.0  # ms
             times.append(elapsed)
 
-            # optional throttle / logging — safe to remove for raw throughput
-            time.sleep(0.00001)
+            # pacing is the token bucket in send_limit (VENUE_MSG_RATE); with it off,
+            # keep the old fixed sleep so a default run is never unpaced
+            if not app.throttle:
+                time.sleep(0.00001)
             i += 1
         
         # keep session alive to receive ExecReports
@@ -452,6 +501,8 @@ def main(cfg, trademode):
             r3elapsed_secs = (r3wall_end_secs - r3wall_start_secs).total_seconds()
             print(f"[Ronnie Math] quote per second: {maxloop/r3elapsed_secs:.2f}")
             print("[Ronnie Math] quote per second:", f"{maxloop / r3elapsed_secs:.2f}")            
+            if app.throttle:
+                print(app.throttle.summary_line())
             while True:
                 time.sleep(1)
 
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# matching_engine.py
+# In-memory price-time matching for ForecastEx style binary contracts.
+#
+# Each contract (55) trades as YES and NO (762). Buying NO at q is the same as
+# selling YES at 100 - q, so everything is matched on one ladder per symbol in
+# YES terms:
+#   YES buy  at p -> bid   at p        NO buy  at q -> offer at 100 - q
+#   YES sell at p -> offer at p        NO sell at q -> bid   at 100 - q
+# so a YES buy at 0.52 crosses a NO buy at 0.48 (or better). Prices are integer
+# ticks 1..99 (cents, see price_ladder.py); a trade prints at the resting
+# order's price and each side is told its fill in its own terms.
+#
+# Levels are fixed 101-slot arrays of FIFO queues. Cancels only mark the order
+# dead and take its size off the level total; dead orders are dropped when the
+# matcher reaches them, so nothing is ever searched for inside a queue.
+#
+# No quickfix in here - venue_simulator.py turns the results into ExecReports.
+from collections import deque, namedtuple
+
+MIN_TICK, MAX_TICK = 1, 99
+_LEVELS = MAX_TICK + 2        # index 0 = "no bid", MAX_TICK + 1 = "no offer"
+
+# one trade: both orders, the quantity and the price in YES ticks
+Fill = namedtuple("Fill", "aggressor resting qty ytick")
+
+
+class Order:
+    __slots__ = ("order_id", "clordid", "symbol", "sec_subtype", "buy", "tick", "qty",
+                 "leaves", "cum", "notional", "account", "tif", "owner", "bid", "ytick")
+
+    def __init__(self, order_id, clordid, symbol, sec_subtype, buy, tick, qty, account, tif, owner):
+        self.order_id = order_id
+        self.clordid = clordid
+        self.symbol = symbol
+        self.sec_subtype = sec_subtype
+        self.buy = buy
+        self.qty = qty
+        self.leaves = qty
+        self.cum = 0
+        self.notional = 0          # sum of fill qty * own tick, for AvgPx
+        self.account = account
+        self.tif = tif
+        self.owner = owner         # opaque to the engine (the simulator keeps the session here)
+        self._set_price(tick)
+
+    def _set_price(self, tick):
+        self.tick = tick           # in this order's own terms
+        yes = self.sec_subtype == "YES"
+        self.bid = yes == self.buy
+        self.ytick = tick if yes else 100 - tick
+
+    def own_tick(self, ytick):
+        """A YES-terms price as this order sees it."""
+        return ytick if self.sec_subtype == "YES" else 100 - ytick
+
+    @property
+    def avg_tick(self):
+        return self.notional / self.cum if self.cum else 0.0
+
+    @property
+    def live(self):
+        return self.leaves > 0
+
+
+class _Book:
+    """Both sides of one symbol, in YES ticks."""
+
+    __slots__ = ("qs", "size", "best_bid", "best_offer")
+
+    def __init__(self):
+        # qs[0] = bids, qs[1] = offers; one deque per tick, created on first use
+        self.qs = ([None] * _LEVELS, [None] * _LEVELS)
+        self.size = ([0] * _LEVELS, [0] * _LEVELS)
+        self.best_bid = 0              # 0 = no bids
+        self.best_offer = MAX_TICK + 1  # no offers
+
+    def add(self, o):
+        side = 0 if o.bid else 1
+        t = o.ytick
+        q = self.qs[side][t]
+        if q is None:
+            q = self.qs[side][t] = deque()
+        q.append(o)
+        self.size[side][t] += o.leaves
+        if side == 0:
+            if t > self.best_bid:
+                self.best_bid = t
+        elif t < self.best_offer:
+            self.best_offer = t
+
+    def remove(self, o):
+        side = 0 if o.bid else 1
+        self.size[side][o.ytick] -= o.leaves
+        self._fix_best(side)
+
+    def _fix_best(self, side):
+        size = self.size[side]
+        if side == 0:
+            t = self.best_bid
+            while t > 0 and size[t] == 0:
+                t -= 1
+            self.best_bid = t
+        else:
+            t = self.best_offer
+            while t <= MAX_TICK and size[t] == 0:
+                t += 1
+            self.best_offer = t
+
+    def match(self, o, out):
+        """Fills o against the other side while it crosses; appends Fills to out."""
+        side = 1 if o.bid else 0          # the side o trades against
+        qs, size = self.qs[side], self.size[side]
+        while o.leaves:
+            t = self.best_offer if o.bid else self.best_bid
+            if (o.bid and t > o.ytick) or (not o.bid and t < o.ytick) or not (MIN_TICK <= t <= MAX_TICK):
+                break
+            q = qs[t]
+            while q and o.leaves:
+                r = q[0]
+                if not r.leaves:           # cancelled / replaced away
+                    q.popleft()
+                    continue
+                n = min(o.leaves, r.leaves)
+                for x in (o, r):
+                    x.leaves -= n
+                    x.cum += n
+                    x.notional += n * x.own_tick(t)
+                size[t] -= n
+                out.append(Fill(o, r, n, t))
+                if not r.leaves:
+                    q.popleft()
+            if not size[t]:
+                q.clear()                  # only dead orders left
+                self._fix_best(side)
+
+    def depth(self, levels=5):
+        """([(ytick, size), ...] bids best first, [...] offers best first)."""
+        bids, offers = [], []
+        size = self.size[0]
+        for t in range(self.best_bid, 0, -1):
+            if size[t]:
+                bids.append((t, size[t]))
+                if len(bids) == levels:
+                    break
+        size = self.size[1]
+        for t in range(self.best_offer, MAX_TICK + 1):
+            if size[t]:
+                offers.append((t, size[t]))
+                if len(offers) == levels:
+                    break
+        return bids, offers
+
+
+class MatchingEngine:
+    """Order entry on top of one _Book per symbol; orders are keyed by ClOrdID."""
+
+    def __init__(self, order_id_prefix="SIM"):
+        self._books = {}
+        self._by_clordid = {}
+        self._prefix = order_id_prefix
+        self._next_oid = 0
+        self.orders = 0
+        self.fills = 0
+        self.cancels = 0
+        self.replaces = 0
+
+    def book(self, symbol):
+        b = self._books.get(symbol)
+        if b is None:
+            b = self._books[symbol] = _Book()
+        return b
+
+    def _check(self, sec_subtype, tick, qty):
+        if sec_subtype not in ("YES", "NO"):
+            raise ValueError(f"SecuritySubType(762) must be YES or NO, got {sec_subtype!r}")
+        if not (MIN_TICK <= tick <= MAX_TICK):
+            raise ValueError(f"price tick {tick} outside {MIN_TICK}..{MAX_TICK}")
+        if qty <= 0:
+            raise ValueError(f"OrderQty(38) must be > 0, got {qty}")
+
+    def get(self, clordid):
+        return self._by_clordid.get(clordid)
+
+    def new_order(self, clordid, symbol, sec_subtype, buy, tick, qty, account=None, tif="0", owner=None):
+        """Accepts one limit order and returns it; match(order) then trades and books it.
+
+        The two steps are split so the caller can ack the order as it was
+        accepted before any fills change it. Raises ValueError for anything the
+        venue would reject (bad 762/price/qty, duplicate ClOrdID).
+        """
+        self._check(sec_subtype, tick, qty)
+        if clordid in self._by_clordid:
+            raise ValueError(f"duplicate ClOrdID {clordid}")
+        self._next_oid += 1
+        o = Order(f"{self._prefix}{self._next_oid}", clordid, symbol, sec_subtype, buy, tick, qty,
+                  account, tif, owner)
+        self._by_clordid[clordid] = o
+        self.orders += 1
+        return o
+
+    def match(self, o):
+        """Trades a just accepted / replaced order and books what is left. Returns [Fill, ...]."""
+        book = self.book(o.symbol)
+        fills = []
+        book.match(o, fills)
+        if o.leaves:
+            book.add(o)
+        self.fills += len(fills)
+        for f in fills:
+            if not f.resting.leaves:
+                self._by_clordid.pop(f.resting.clordid, None)
+        if not o.leaves:
+            self._by_clordid.pop(o.clordid, None)
+        return fills
+
+    def cancel(self, orig_clordid):
+        """Pulls a live order off the book; returns it (leaves already zeroed) or None."""
+        o = self._by_clordid.pop(orig_clordid, None)
+        if o is None:
+            return None
+        self._books[o.symbol].remove(o)
+        o.leaves = 0
+        self.cancels += 1
+        return o
+
+    def replace(self, orig_clordid, clordid, tick, qty):
+        """Cancel/replace: new price and total qty, to be re-queued at the back by match().
+
+        Returns the replaced order, or None if orig_clordid is not live.
+        qty is the new total order quantity; what has already filled counts
+        against it, and a qty at or below cum just cancels the rest.
+        """
+        o = self._by_clordid.get(orig_clordid)
+        if o is None:
+            return None
+        self._check(o.sec_subtype, tick, qty)
+        if clordid in self._by_clordid:
+            raise ValueError(f"duplicate ClOrdID {clordid}")
+        book = self._books[o.symbol]
+        book.remove(o)
+        del self._by_clordid[orig_clordid]
+        self.replaces += 1
+        # the old queue entry is left behind dead; the order re-enters as a new object
+        n = Order(o.order_id, clordid, o.symbol, o.sec_subtype, o.buy, tick, qty, o.account, o.tif, o.owner)
+        n.cum, n.notional = o.cum, o.notional
+        n.leaves = max(0, qty - o.cum)
+        o.leaves = 0
+        if n.leaves:
+            self._by_clordid[clordid] = n
+        return n
+
+    def live_orders(self):
+        return len(self._by_clordid)
+
+    def summary_line(self, prefix="[ENGINE]"):
+        return (f"{prefix} orders={self.orders} fills={self.fills} cancels={self.cancels} "
+                f"replaces={self.replaces} live={self.live_orders()} symbols={len(self._books)}")
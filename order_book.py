@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# order_book.py
+# Aggregated L2 book per (Symbol 55, SecuritySubType 762) from 35=W / 35=X.
+#
+# Prices on this venue are whole cents 0.01..0.99, so each side of a book is a
+# fixed 99-slot array of sizes indexed by tick - 1 (see price_ladder.py); there
+# is no sorting and no per-level object. MDUpdateAction (279) maps straight
+# onto a slot:
+#   0 new / 1 change  -> size at that price = MDEntrySize (aggregated book, 266=Y)
+#   2 delete          -> size at that price = 0
+# Best bid / offer are kept as ticks and only move when a level at or beyond
+# them changes; a delete at the top walks to the next non-empty slot (at most
+# 98 steps, usually 1). Trades (269=2) only update the last trade.
+#
+#   books = OrderBooks()
+#   books.apply_update("CBBTC_123125_132500", "YES", "0", "0", 0.52, 10)
+#   books.get("CBBTC_123125_132500", "YES").best_bid()     # (52, 10)
+#
+# Synthetic book: buying YES at p is selling NO at 1 - p, so per contract the
+# YES and NO books are one market. With OrderBooks(synthetic=True) each symbol
+# also gets a SyntheticBook in YES terms:
+#   bid at t   = YES bids at t   + NO offers at 100 - t
+#   offer at t = YES offers at t + NO bids at 100 - t
+# Every YES/NO level change touches exactly one synthetic level, which is
+# recomputed from the two source slots - no rebuild per update. Only a 35=W
+# snapshot (which replaces a whole source book) rebuilds that symbol's view.
+#
+#   books.synthetic("CBBTC_123125_132500").best_offer()    # cheapest YES, direct or via NO
+from array import array
+
+MIN_TICK, MAX_TICK = 1, 99
+_SLOTS = MAX_TICK - MIN_TICK + 1
+
+BID, OFFER, TRADE = "0", "1", "2"                 # MDEntryType (269)
+NEW, CHANGE, DELETE = "0", "1", "2"               # MDUpdateAction (279)
+
+
+def px_tick(px) -> int:
+    """0.52 / "0.52" -> 52 without Decimal; this runs once per MD entry."""
+    return int(float(px) * 100 + 0.5)
+
+
+class L2Book:
+    """Both sides of one (symbol, 762) book as 99-slot size arrays."""
+
+    __slots__ = ("symbol", "sec_subtype", "bids", "offers", "best_bid_tick", "best_offer_tick",
+                 "last_tick", "last_size", "updates")
+
+    def __init__(self, symbol, sec_subtype):
+        self.symbol = symbol
+        self.sec_subtype = sec_subtype
+        self.bids = array("q", bytes(8 * _SLOTS))
+        self.offers = array("q", bytes(8 * _SLOTS))
+        self.best_bid_tick = 0                    # 0 = no bids
+        self.best_offer_tick = MAX_TICK + 1       # 100 = no offers
+        self.last_tick = 0
+        self.last_size = 0
+        self.updates = 0
+
+    def clear(self):
+        for i in range(_SLOTS):
+            self.bids[i] = 0
+            self.offers[i] = 0
+        self.best_bid_tick = 0
+        self.best_offer_tick = MAX_TICK + 1
+
+    def set_level(self, entry_type, tick, size):
+        """Sets one aggregated level (size 0 removes it). False if the entry was ignored."""
+        if not (MIN_TICK <= tick <= MAX_TICK):
+            return False
+        self.updates += 1
+        if entry_type == BID:
+            self.bids[tick - 1] = size
+            if size:
+                if tick > self.best_bid_tick:
+                    self.best_bid_tick = tick
+            elif tick == self.best_bid_tick:
+                t, bids = tick - 1, self.bids
+                while t >= MIN_TICK and not bids[t - 1]:
+                    t -= 1
+                self.best_bid_tick = t
+        elif entry_type == OFFER:
+            self.offers[tick - 1] = size
+            if size:
+                if tick < self.best_offer_tick:
+                    self.best_offer_tick = tick
+            elif tick == self.best_offer_tick:
+                t, offers = tick + 1, self.offers
+                while t <= MAX_TICK and not offers[t - 1]:
+                    t += 1
+                self.best_offer_tick = t
+        elif entry_type == TRADE:
+            self.last_tick = tick
+            self.last_size = size
+        else:
+            self.updates -= 1
+            return False
+        return True
+
+    # ---- queries ----
+    def best_bid(self):
+        """(tick, size) or None."""
+        t = self.best_bid_tick
+        return (t, self.bids[t - 1]) if t else None
+
+    def best_offer(self):
+        t = self.best_offer_tick
+        return (t, self.offers[t - 1]) if t <= MAX_TICK else None
+
+    def spread(self):
+        """Offer - bid in ticks; None if either side is empty."""
+        if self.best_bid_tick and self.best_offer_tick <= MAX_TICK:
+            return self.best_offer_tick - self.best_bid_tick
+        return None
+
+    def size_at(self, entry_type, tick):
+        if not (MIN_TICK <= tick <= MAX_TICK):
+            return 0
+        return (self.bids if entry_type == BID else self.offers)[tick - 1]
+
+    def depth_into(self, entry_type, ticks, sizes, levels=None):
+        """Writes the best `levels` non-empty levels of one side, best first, into the
+        caller's ticks/sizes arrays (reuse them: no allocation here); returns the count."""
+        n = 0
+        limit = min(len(ticks), len(sizes), levels or _SLOTS)
+        if entry_type == BID:
+            side, t, stop, step = self.bids, self.best_bid_tick, MIN_TICK - 1, -1
+        else:
+            side, t, stop, step = self.offers, self.best_offer_tick, MAX_TICK + 1, 1
+        while t != stop and n < limit:
+            sz = side[t - 1]
+            if sz:
+                ticks[n] = t
+                sizes[n] = sz
+                n += 1
+            t += step
+        return n
+
+    def top_line(self, prefix="[BOOK]"):
+        b, o = self.best_bid(), self.best_offer()
+        bid = f"{b[1]}@0.{b[0]:02d}" if b else "-"
+        offer = f"{o[1]}@0.{o[0]:02d}" if o else "-"
+        last = f"  last={self.last_size}@0.{self.last_tick:02d}" if self.last_tick else ""
+        return f"{prefix} {self.symbol} {self.sec_subtype} bid={bid} offer={offer}{last}  updates={self.updates}"
+
+
+_OTHER_SIDE = {BID: OFFER, OFFER: BID}
+
+
+class SyntheticBook(L2Book):
+    """Merged YES + NO view of one contract, in YES ticks (sec_subtype "SYN")."""
+
+    __slots__ = ("yes", "no")
+
+    def __init__(self, yes: L2Book, no: L2Book):
+        super().__init__(yes.symbol, "SYN")
+        self.yes = yes
+        self.no = no
+        self.rebuild()
+
+    def on_level(self, source: L2Book, entry_type, tick):
+        """Re-derives the one synthetic level a source level change maps to."""
+        if entry_type == TRADE:
+            t = tick if source is self.yes else 100 - tick
+            self.set_level(TRADE, t, source.last_size)
+            return
+        if source is self.no:
+            entry_type, tick = _OTHER_SIDE[entry_type], 100 - tick
+        self.set_level(entry_type, tick, self.yes.size_at(entry_type, tick)
+                       + self.no.size_at(_OTHER_SIDE[entry_type], 100 - tick))
+
+    def rebuild(self):
+        yes, no = self.yes, self.no
+        bids, offers = self.bids, self.offers
+        best_bid, best_offer = 0, MAX_TICK + 1
+        for t in range(MIN_TICK, MAX_TICK + 1):
+            b = yes.bids[t - 1] + no.offers[99 - t]        # NO offer at 100 - t
+            o = yes.offers[t - 1] + no.bids[99 - t]        # NO bid at 100 - t
+            bids[t - 1], offers[t - 1] = b, o
+            if b:
+                best_bid = t
+            if o and best_offer > MAX_TICK:
+                best_offer = t
+        self.best_bid_tick, self.best_offer_tick = best_bid, best_offer
+
+
+class OrderBooks:
+    """One L2Book per (symbol, SecuritySubType), created on first use."""
+
+    def __init__(self, synthetic=False):
+        self._books = {}
+        self._synthetic = {} if synthetic else None    # symbol -> SyntheticBook
+        self.ignored = 0      # entries with no book, price outside 0.01..0.99, or an unknown type
+
+    def synthetic(self, symbol):
+        """Merged YES/NO book for symbol (needs OrderBooks(synthetic=True))."""
+        syn = self._synthetic.get(symbol)
+        if syn is None:
+            syn = self._synthetic[symbol] = SyntheticBook(self.get(symbol, "YES"), self.get(symbol, "NO"))
+        return syn
+
+    def get(self, symbol, sec_subtype):
+        key = (symbol, sec_subtype)
+        b = self._books.get(key)
+        if b is None:
+            b = self._books[key] = L2Book(symbol, sec_subtype)
+        return b
+
+    def __iter__(self):
+        return iter(self._books.values())
+
+    def apply_snapshot(self, symbol, sec_subtype, entries):
+        """35=W: replaces the book with entries [(entry_type, px, size), ...]."""
+        book = self.get(symbol, sec_subtype)
+        book.clear()
+        for entry_type, px, size in entries:
+            if px is None or not book.set_level(entry_type, px_tick(px), int(size or 0)):
+                self.ignored += 1
+        if self._synthetic is not None and sec_subtype in ("YES", "NO"):
+            self.synthetic(symbol).rebuild()
+        return book
+
+    def apply_update(self, symbol, sec_subtype, action, entry_type, px, size):
+        """One 35=X entry. Returns the book, or None if the entry was ignored."""
+        if px is None or not symbol:
+            self.ignored += 1
+            return None
+        book = self.get(symbol, sec_subtype)
+        tick = px_tick(px)
+        if not book.set_level(entry_type, tick, 0 if action == DELETE else int(size or 0)):
+            self.ignored += 1
+            return None
+        if self._synthetic is not None and sec_subtype in ("YES", "NO"):
+            self.synthetic(symbol).on_level(book, entry_type, tick)
+        return book
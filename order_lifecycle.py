@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# order_lifecycle.py
+# Live-order book for the new / cancel / cancel-replace workload.
+#
+# The sender only cancels or replaces orders the venue has acknowledged and not
+# yet finished. Each request we send goes into `pending` with its kind (D/F/G)
+# and static details. A NOS moves into the live set on its first ER, a replace
+# only on its 8/5; a cancel never does. Interim ERs for an F/G (8/6 pending
+# cancel, 8/E pending replace) leave it pending. Anything that ends it (8/4, 8/8,
+# 8/C, or a fill with 39=2) takes it out, and so does a 35=9 for a request that
+# named it. Picking an order to cancel/replace takes it out of the live set
+# straight away so two requests never chase the same order; a replace puts it
+# back under its new ClOrdID once acked.
+#
+# Live orders sit in a list with a clordid -> position map so a random pick and
+# a removal are both O(1) (swap with the last element and pop).
+import random, threading
+from collections import namedtuple
+
+# what a cancel / replace needs to repeat from the original order
+LiveOrder = namedtuple("LiveOrder", "symbol buy qty price sec_subtype account orderid")
+
+_DONE_EXECTYPES = {"4", "8", "C"}          # canceled, rejected, expired
+_DONE_ORDSTATUS = {"2", "4", "8", "C"}     # filled, canceled, rejected, expired
+
+
+class LiveOrderBook:
+    """Orders we sent, split into pending (no ack yet) and live (acked, open)."""
+
+    def __init__(self, seed=None):
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self._pending = {}     # clordid -> (kind "D"/"F"/"G", LiveOrder), waiting for its ack
+        self._ids = []         # live clordids
+        self._pos = {}         # clordid -> index in _ids
+        self._info = {}        # clordid -> LiveOrder
+        self.acked = 0
+        self.done = 0          # live orders that were filled / canceled / expired
+        self.rejected = 0      # requests answered with 8/8 or 35=9
+
+    def __len__(self):
+        return len(self._ids)
+
+    @property
+    def pending(self):
+        return len(self._pending)
+
+    def note_sent(self, clordid, order: LiveOrder, kind="D"):
+        """Call when a request goes out (kind D, F or G); order is what it asked for."""
+        with self._lock:
+            self._pending[clordid] = (kind, order)
+
+    def send_failed(self, clordid, orig_clordid=None, orig_order=None):
+        """sendToTarget refused the request: forget it, and put back the order an F/G took."""
+        with self._lock:
+            self._pending.pop(clordid, None)
+            if orig_clordid is not None and orig_clordid not in self._pos:
+                self._add_live(orig_clordid, orig_order)
+
+    def _add_live(self, clordid, order):
+        self._pos[clordid] = len(self._ids)
+        self._ids.append(clordid)
+        self._info[clordid] = order
+
+    def _remove_live(self, clordid):
+        i = self._pos.pop(clordid, None)
+        if i is None:
+            return None
+        last = self._ids.pop()
+        if i < len(self._ids):
+            self._ids[i] = last
+            self._pos[last] = i
+        return self._info.pop(clordid)
+
+    def on_exec_report(self, clordid, orderid, exectype, ordstatus):
+        with self._lock:
+            req = self._pending.get(clordid)
+            if req is not None:
+                kind, order = req
+                if exectype in _DONE_EXECTYPES or ordstatus in _DONE_ORDSTATUS:
+                    # our cancel acked (8/4), or the request was rejected / filled right away
+                    del self._pending[clordid]
+                    if exectype == "8":
+                        self.rejected += 1
+                    return
+                if kind == "F" or (kind == "G" and exectype != "5"):
+                    return                 # pending cancel / replace: not an order we can pick
+                del self._pending[clordid]
+                self.acked += 1
+                if orderid and orderid != order.orderid:
+                    order = order._replace(orderid=orderid)
+                self._add_live(clordid, order)
+                return
+            if exectype in _DONE_EXECTYPES or ordstatus in _DONE_ORDSTATUS:
+                if self._remove_live(clordid) is not None:
+                    self.done += 1
+
+    def on_cancel_reject(self, clordid):
+        """35=9 for one of our F/G requests; the order it named stays out of the book."""
+        with self._lock:
+            if self._pending.pop(clordid, None) is not None:
+                self.rejected += 1
+
+    def take(self):
+        """Removes and returns a random live (clordid, LiveOrder); None if nothing is live."""
+        with self._lock:
+            if not self._ids:
+                return None
+            clordid = self._ids[self._rng.randrange(len(self._ids))]
+            return clordid, self._remove_live(clordid)
+
+    def summary_line(self, prefix="[LIVE]"):
+        return (f"{prefix} live={len(self._ids)} pending={len(self._pending)} acked={self.acked} "
+                f"done={self.done} rejected={self.rejected}")
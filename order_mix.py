@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# order_mix.py
+# Weighted order mix: which account / symbol / SecuritySubType(762) / qty each order uses.
+#
+# A mix is a list of TradeType rows with weights. It is expanded once, before the
+# run, into a schedule of exactly n orders: each row gets its share of n (largest
+# remainder, so the counts add up), then the schedule is shuffled with a seeded
+# RNG so the combinations interleave the same way every run. The send loop just
+# walks the schedule; each row's index doubles as its latency tag in the tracker.
+import random
+from array import array
+from dataclasses import dataclass
+from itertools import product
+
+
+@dataclass(frozen=True)
+class TradeType:
+    account: str
+    symbol: str
+    sec_subtype: str          # 762: YES / NO
+    qty: int = 1
+    weight: float = 1.0
+
+    @property
+    def tag(self):
+        return f"{self.account}/{self.symbol}/{self.sec_subtype}/{self.qty}"
+
+
+def matrix(accounts, symbols, sec_subtypes=("YES", "NO"), qtys=(1,), weight=1.0):
+    """Every account x symbol x 762 x qty combination at the same weight."""
+    return [TradeType(a, s, st, q, weight) for a, s, st, q in product(accounts, symbols, sec_subtypes, qtys)]
+
+
+def allocate(weights, n):
+    """Splits n into integer counts proportional to weights (largest remainder)."""
+    total = float(sum(weights))
+    if total <= 0:
+        raise ValueError("weights must add up to > 0")
+    exact = [w * n / total for w in weights]
+    counts = [int(x) for x in exact]
+    # hand the leftover orders to the rows that lost the most to rounding down
+    by_remainder = sorted(range(len(weights)), key=lambda i: exact[i] - counts[i], reverse=True)
+    for i in by_remainder[:n - sum(counts)]:
+        counts[i] += 1
+    return counts
+
+
+def shuffled_schedule(weights, n, seed=None):
+    """(counts, array of row indices): allocate(weights, n) of each row, in seeded random order."""
+    counts = allocate(weights, int(n))
+    sched = [i for i, c in enumerate(counts) for _ in range(c)]
+    random.Random(seed).shuffle(sched)
+    return counts, array("H", sched)
+
+
+class OrderMix:
+    """Precomputed, shuffled schedule of n TradeTypes drawn to the mix's weights."""
+
+    def __init__(self, types, n, seed=None):
+        self.types = list(types)
+        if not self.types:
+            raise ValueError("order mix is empty")
+        if any(t.weight < 0 for t in self.types):
+            raise ValueError("weights must be >= 0")
+        # schedule: index into self.types, one per order
+        self.counts, self.schedule = shuffled_schedule([t.weight for t in self.types], n, seed)
+
+    def __len__(self):
+        return len(self.schedule)
+
+    def __getitem__(self, i):
+        """(tag index, TradeType) of order i."""
+        k = self.schedule[i]
+        return k, self.types[k]
+
+    def __iter__(self):
+        types = self.types
+        for k in self.schedule:
+            yield k, types[k]
+
+    @property
+    def tags(self):
+        return [t.tag for t in self.types]
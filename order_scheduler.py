@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# order_scheduler.py
+# Open-loop send scheduler for the order senders.
+#
+# Every send time is fixed before the run starts, as an offset (ns) from the
+# start. A slow send never pushes the next one back (that would be closed-loop
+# and the real rate would depend on how slow the venue/our code is); instead the
+# next send fires as soon as we are free and the skew is recorded as lag.
+#
+# The offsets come from an arrival process, all precomputed into an array so the
+# hot loop does nothing but wait and send:
+#   constant  evenly spaced at qps
+#   poisson   exponential gaps with mean 1/qps (seeded)
+#   onoff     bursts: on_s seconds at qps, then off_s seconds silent
+#   replay    inter-arrival gaps of 35=D (or other) messages in a QuickFIX message log
+import random, re, time
+from array import array
+from datetime import datetime
+
+NS = 1_000_000_000
+
+
+# ===== arrival processes (offsets in ns from start) =====
+def constant_arrivals(qps, n):
+    step = NS / qps
+    return array("q", (int(round(i * step)) for i in range(n)))
+
+
+def poisson_arrivals(qps, n, seed=None):
+    rng = random.Random(seed)
+    out = array("q", bytes(8 * n))
+    t = 0.0
+    for i in range(n):
+        out[i] = int(t)
+        t += rng.expovariate(qps) * NS
+    return out
+
+
+def onoff_arrivals(qps, n, on_s, off_s, seed=None, poisson=False):
+    """Bursts at qps for on_s seconds, then nothing for off_s seconds, repeated."""
+    if on_s <= 0:
+        raise ValueError("on_s must be > 0")
+    inner = poisson_arrivals(qps, n, seed) if poisson else constant_arrivals(qps, n)
+    on_ns, period_ns = int(on_s * NS), int((on_s + off_s) * NS)
+    # lay the 'on' time of the inner process end to end, skipping the off gaps
+    return array("q", ((t // on_ns) * period_ns + t % on_ns for t in inner))
+
+
+_SOH_SPLIT = re.compile(r"[\x01|^]")
+
+
+def sending_time_ns(v):
+    # 52 / 60 style UTC timestamp: YYYYMMDD-HH:MM:SS[.sss[sss[sss]]]
+    base, _, frac = v.partition(".")
+    dt = datetime.strptime(base, "%Y%m%d-%H:%M:%S")
+    return int(dt.timestamp()) * NS + int((frac + "000000000")[:9])
+
+
+def log_send_times_ns(log_path, msg_types=("D",)):
+    """SendingTime(52) in ns for each message of msg_types in a FIX message log."""
+    times = []
+    with open(log_path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if "35=" not in line:
+                continue
+            mt = ts = None
+            for fld in _SOH_SPLIT.split(line):
+                if fld.startswith("35="):
+                    mt = fld[3:].strip()
+                elif fld.startswith("52="):
+                    ts = fld[3:].strip()
+                if mt is not None and ts is not None:
+                    break
+            if mt in msg_types and ts:
+                try:
+                    times.append(sending_time_ns(ts))
+                except ValueError:
+                    pass
+    return times
+
+
+def replay_arrivals(log_path, n=None, speed=1.0, msg_types=("D",), times=None):
+    """Offsets that repeat the captured inter-arrival gaps, speed x faster (2.0 = twice as fast).
+
+    times: captured send times (ns) to use instead of reading 52s out of log_path.
+    """
+    if speed <= 0:
+        raise ValueError("speed must be > 0")
+    if times is None:
+        times = log_send_times_ns(log_path, msg_types)
+    if n is not None:
+        times = times[:n]
+    if not times:
+        return array("q")
+    t0 = times[0]
+    # clamp out-of-order stamps (different sessions in one log) to zero gap
+    out, last = array("q"), 0
+    for t in times:
+        off = max(last, int((t - t0) / speed))
+        out.append(off)
+        last = off
+    return out
+
+
+def build_arrivals(profile, qps=None, n=None, seed=None, on_s=1.0, off_s=1.0, poisson=False,
+                   replay_log=None, speed=1.0):
+    """Offsets array for one of the named profiles above (poisson: onoff bursts get Poisson gaps)."""
+    profile = (profile or "constant").lower()
+    if profile == "replay":
+        if not replay_log:
+            raise ValueError("replay profile needs replay_log")
+        return replay_arrivals(replay_log, n, speed)
+    if not qps or qps <= 0 or n is None:
+        raise ValueError(f"{profile} profile needs qps > 0 and n")
+    if profile == "constant":
+        return constant_arrivals(qps, n)
+    if profile == "poisson":
+        return poisson_arrivals(qps, n, seed)
+    if profile == "onoff":
+        return onoff_arrivals(qps, n, on_s, off_s, seed, poisson)
+    raise ValueError(f"unknown arrival profile {profile!r}")
+
+
+# ===== scheduler =====
+class OpenLoopScheduler:
+    """Calls send_fn(i, planned_ns) on a fixed timetable and records planned vs actual.
+
+    Pass qps for a constant rate, or arrivals= a precomputed offsets array
+    (see build_arrivals); either way duration_s/max_orders cut the run short.
+    """
+
+    def __init__(self, qps=None, duration_s=None, max_orders=None, spin_us=200, arrivals=None):
+        if arrivals is None:
+            if not qps or qps <= 0:
+                raise ValueError("qps must be > 0")
+            if duration_s is None and max_orders is None:
+                raise ValueError("need duration_s and/or max_orders to bound the run")
+            n = int(duration_s * qps) if duration_s is not None else max_orders
+            if max_orders is not None:
+                n = min(n, max_orders)
+            arrivals = constant_arrivals(qps, max(0, int(n)))
+        else:
+            n = len(arrivals)
+            if max_orders is not None:
+                n = min(n, max_orders)
+            if duration_s is not None:
+                limit = int(duration_s * NS)
+                while n and arrivals[n - 1] >= limit:
+                    n -= 1
+            arrivals = arrivals[:n]
+
+        self._offsets = arrivals
+        self.planned = len(arrivals)
+        span_ns = arrivals[-1] if self.planned > 1 else 0
+        # target rate: qps as given, else the mean rate of the timetable
+        if qps:
+            self.qps = float(qps)
+        else:
+            self.qps = (self.planned - 1) * NS / span_ns if span_ns else 0.0
+        self.interval_ns = int(round(NS / self.qps)) if self.qps else 0
+        # sleep until spin_ns before the deadline, then busy-wait the rest
+        self.spin_ns = int(spin_us * 1000)
+
+        self.start_ns = 0
+        self.end_ns = 0
+        self.sent = 0
+        self._lag_ns = array("q", bytes(8 * self.planned))   # actual - planned, per send
+
+    @staticmethod
+    def _now_ns():
+        return time.perf_counter_ns()
+
+    def planned_ns(self, i):
+        return self.start_ns + self._offsets[i]
+
+    def run(self, send_fn):
+        """Runs the whole timetable; returns number of sends made."""
+        now_ns = self._now_ns
+        sleep = time.sleep
+        spin_ns = self.spin_ns
+        offsets = self._offsets
+        lag = self._lag_ns
+
+        self.start_ns = start = now_ns()
+        self.sent = 0
+        try:
+            for i in range(self.planned):
+                planned = start + offsets[i]
+                wait = planned - now_ns()
+                if wait > spin_ns:
+                    sleep((wait - spin_ns) / NS)
+                while now_ns() < planned:
+                    pass
+                lag[i] = now_ns() - planned
+                send_fn(i, planned)
+                self.sent = i + 1
+        finally:
+            self.end_ns = now_ns()
+        return self.sent
+
+    def summary(self):
+        n = self.sent
+        if n == 0:
+            return {"planned": self.planned, "sent": 0}
+        lags = sorted(self._lag_ns[:n])
+        elapsed_s = (self.end_ns - self.start_ns) / NS
+        # planned span of the sends actually made (first to last planned time)
+        planned_span_s = self._offsets[n - 1] / NS
+        return {
+            "planned": self.planned,
+            "sent": n,
+            "target_qps": self.qps,
+            "actual_qps": (n / elapsed_s) if elapsed_s > 0 else 0.0,
+            "planned_span_s": planned_span_s,
+            "elapsed_s": elapsed_s,
+            "lag_p50_us": lags[int(0.50 * (n - 1))] / 1000.0,
+            "lag_p99_us": lags[int(0.99 * (n - 1))] / 1000.0,
+            "lag_max_us": lags[-1] / 1000.0,
+            # fired > 1 mean interval behind plan; a one-send (or all-at-once) timetable
+            # has no interval to be late by
+            "late": sum(1 for x in lags if x > self.interval_ns) if self.interval_ns else 0,
+        }
+
+    def summary_line(self, prefix="[SCHED]"):
+        s = self.summary()
+        if s["sent"] == 0:
+            return f"{prefix} planned={s['planned']} sent=0"
+        return (f"{prefix} planned={s['planned']} sent={s['sent']}  "
+                f"target={s['target_qps']:.1f}/s actual={s['actual_qps']:.1f}/s  "
+                f"span planned={s['planned_span_s']:.3f}s actual={s['elapsed_s']:.3f}s  "
+                f"lag p50={s['lag_p50_us']:.1f}us p99={s['lag_p99_us']:.1f}us "
+                f"max={s['lag_max_us']:.1f}us  late={s['late']}")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# order_templates.py
+# Pre-built NewOrderSingle per trade type.
+#
+# Only ClOrdID(11), TransactTime(60) and Price(44) change between our orders, so
+# the static fields (1, 55, 54, 40, 38, 581, 582, 762, 59) are set once when the
+# template is made and each send just overwrites the three that change on the
+# same message object. sendToTarget rewrites the header (34, 52, ...) on every
+# send, so re-using the message is safe - but only from one sending thread.
+#
+# Cancels (35=F) and cancel/replaces (35=G) point at a different order every
+# time, so build_cancel / build_replace make a fresh message per call.
+import quickfix as fix
+import quickfix50sp2 as fix50sp2
+
+
+class NosTemplate:
+    """One reusable NewOrderSingle with the static fields already set."""
+
+    def __init__(self, symbol, sec_subtype, qty, account=None, buy=True,
+                 tif=fix.TimeInForce_DAY):
+        self.symbol = symbol
+        self.sec_subtype = sec_subtype
+        self.qty = qty
+        self.account = account
+        self.buy = buy
+
+        nos = fix50sp2.NewOrderSingle()
+        if account: nos.setField(fix.Account(account))                      # 1
+        nos.setField(fix.Symbol(symbol))                                    # 55
+        nos.setField(fix.Side(fix.Side_BUY if buy else fix.Side_SELL))      # 54
+        nos.setField(fix.OrdType(fix.OrdType_LIMIT))                        # 40=2
+        nos.setField(fix.OrderQty(float(qty)))                              # 38
+        nos.setField(fix.CustOrderCapacity(1))                              # 582
+        nos.setField(fix.AccountType(1))                                    # 581
+        nos.setField(fix.SecuritySubType(sec_subtype))                      # 762
+        nos.setField(fix.TimeInForce(tif))                                  # 59
+        self.msg = nos
+
+    def build(self, clordid, price):
+        """Sets 11/60/44 and returns the (shared) message ready for sendToTarget.
+
+        price may be a float or an already formatted string like "0.52".
+        """
+        nos = self.msg
+        nos.setField(fix.ClOrdID(clordid))                                  # 11
+        nos.setField(fix.TransactTime())                                    # 60 (now)
+        if isinstance(price, str):
+            nos.setField(44, price)                                         # 44, pre-formatted
+        else:
+            nos.setField(fix.Price(float(price)))                           # 44
+        return nos
+
+
+class NosTemplateBook:
+    """Lazily builds and caches one NosTemplate per trade type."""
+
+    def __init__(self, tif=fix.TimeInForce_DAY):
+        self.tif = tif
+        self._templates = {}
+
+    def get(self, symbol, sec_subtype, qty, account=None, buy=True):
+        key = (symbol, sec_subtype, qty, account, buy)
+        t = self._templates.get(key)
+        if t is None:
+            t = self._templates[key] = NosTemplate(symbol, sec_subtype, qty, account, buy, self.tif)
+        return t
+
+
+def build_cancel(clordid, orig_clordid, symbol, buy, sec_subtype=None, account=None,
+                 qty=None, orderid=None):
+    """OrderCancelRequest (35=F) for one of our live orders."""
+    msg = fix50sp2.OrderCancelRequest()
+    msg.setField(fix.OrigClOrdID(orig_clordid))                         # 41
+    msg.setField(fix.ClOrdID(clordid))                                  # 11
+    if orderid: msg.setField(fix.OrderID(orderid))                      # 37
+    if account: msg.setField(fix.Account(account))                      # 1
+    msg.setField(fix.Symbol(symbol))                                    # 55
+    msg.setField(fix.Side(fix.Side_BUY if buy else fix.Side_SELL))      # 54
+    if qty is not None: msg.setField(fix.OrderQty(float(qty)))          # 38
+    if sec_subtype: msg.setField(fix.SecuritySubType(sec_subtype))      # 762
+    msg.setField(fix.TransactTime())                                    # 60 (now)
+    return msg
+
+
+def build_replace(clordid, orig_clordid, symbol, buy, qty, price, sec_subtype, account=None,
+                  orderid=None, tif=fix.TimeInForce_DAY):
+    """OrderCancelReplaceRequest (35=G): same order, new price/qty."""
+    msg = fix50sp2.OrderCancelReplaceRequest()
+    msg.setField(fix.OrigClOrdID(orig_clordid))                         # 41
+    msg.setField(fix.ClOrdID(clordid))                                  # 11
+    if orderid: msg.setField(fix.OrderID(orderid))                      # 37
+    if account: msg.setField(fix.Account(account))                      # 1
+    msg.setField(fix.Symbol(symbol))                                    # 55
+    msg.setField(fix.Side(fix.Side_BUY if buy else fix.Side_SELL))      # 54
+    msg.setField(fix.OrdType(fix.OrdType_LIMIT))                        # 40=2
+    msg.setField(fix.OrderQty(float(qty)))                              # 38
+    if isinstance(price, str):
+        msg.setField(44, price)                                         # 44, pre-formatted
+    else:
+        msg.setField(fix.Price(float(price)))                           # 44
+    msg.setField(fix.CustOrderCapacity(1))                              # 582
+    msg.setField(fix.AccountType(1))                                    # 581
+    msg.setField(fix.SecuritySubType(sec_subtype))                      # 762
+    msg.setField(fix.TimeInForce(tif))                                  # 59
+    msg.setField(fix.TransactTime())                                    # 60 (now)
+    return msg
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# price_ladder.py
+# Integer-tick bounce ladders for layer mode.
+#
+# Prices on this venue are whole cents 0.01..0.99, so a ladder is just a list of
+# ticks (1..99). The full bounce cycle (low -> high -> back down) and its "0.52"
+# style price strings are built once; the send loop then only walks iterators,
+# with no Decimal/float math per order.
+from decimal import Decimal, ROUND_HALF_UP
+from itertools import chain, cycle, repeat
+
+MIN_TICK = 1      # 0.01
+MAX_TICK = 99     # 0.99
+
+
+def to_tick(price) -> int:
+    """0.52 / "0.52" / Decimal("0.52") -> 52 (half-up, like _q)."""
+    return int((Decimal(str(price)) * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def tick_str(tick: int) -> str:
+    return f"0.{tick:02d}"
+
+
+def bounce_ticks(low: int, high: int, step: int):
+    """One full cycle low..high..low in ticks; edges always included, low not repeated.
+
+    e.g. (52, 62, 3) -> [52, 55, 58, 61, 62, 59, 56, 53]; the next cycle starts at 52.
+    """
+    if step <= 0:
+        raise ValueError("step must be >= 1 tick")
+    if not (MIN_TICK <= low <= high <= MAX_TICK):
+        raise ValueError(f"ladder {low}..{high} outside {MIN_TICK}..{MAX_TICK} ticks")
+    up = list(range(low, high, step)) + [high]
+    down = list(range(high - step, low, -step))
+    return up + down
+
+
+class PriceLadder:
+    """One precomputed bounce ladder plus the order leg it is sent on."""
+
+    def __init__(self, low, high, step, sec_subtype="YES", account=None, qty=1):
+        # low/high/step in dollars (0.52, 0.62, 0.01), converted to ticks once
+        self.ticks = bounce_ticks(to_tick(low), to_tick(high), to_tick(step))
+        self.prices = [tick_str(t) for t in self.ticks]
+        self.sec_subtype = sec_subtype
+        self.account = account
+        self.qty = qty
+
+    def __len__(self):
+        return len(self.ticks)
+
+    def mirrored(self, sec_subtype, account=None):
+        """Same ladder on the other side of the contract: tick t -> 100 - t."""
+        m = PriceLadder.__new__(PriceLadder)
+        m.ticks = [100 - t for t in self.ticks]
+        m.prices = [tick_str(t) for t in m.ticks]
+        m.sec_subtype = sec_subtype
+        m.account = self.account if account is None else account
+        m.qty = self.qty
+        return m
+
+
+def ladder_walk(ladders):
+    """Endless (ladder, price_str) stream, round-robin across ladders.
+
+    Each ladder cycles through its own precomputed prices; take what you need
+    with itertools.islice(ladder_walk(ladders), max_orders).
+    """
+    legs = [zip(repeat(l), cycle(l.prices)) for l in ladders]
+    return chain.from_iterable(zip(*legs))
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# replay_log.py
+# Re-send the orders captured in a QuickFIX FileLog messages log.
+#
+# Streams the 35=D/F/G messages out of e.g. store/FIXT.1.1-4C001-ForecastEx.messages.current.log,
+# gives each one a fresh ClOrdID(11) from ClOrdIdGen and TransactTime(60)=now,
+# points OrigClOrdID(41) of cancels/replaces at the new id of the order it named,
+# and sends it on our session - at the captured pace, sped up / slowed down, or
+# as fast as possible. Latency goes through FIXLatencyTester's App/LatencyTracker
+# like a normal run, split per message type (D->8/0, F->8/4, G->8/5).
+#
+#   python3 replay_log.py config/sendOrder20251103.cfg store/FIXT.1.1-4C001-ForecastEx.messages.current.log
+#   python3 replay_log.py cfg log --speed 4          # 4x the captured rate
+#   python3 replay_log.py cfg log --asap --types D   # only the NOSes, back to back
+#
+# Header/session fields (8, 9, 34, 49, 52, 56, 10, ...) are left to QuickFIX and
+# the captured OrderID(37) is dropped; every other field is copied over in log
+# order. Repeating groups are copied flat, which is fine for our order messages
+# (they have none).
+import argparse, re, sys, time
+from itertools import islice
+from array import array
+
+import quickfix as fix
+
+import FIXLatencyTester as flt
+from clordid_gen import run_prefix
+from order_scheduler import OpenLoopScheduler, replay_arrivals, sending_time_ns
+
+# header / trailer / session-level tags QuickFIX fills in itself (50 comes from toApp),
+# plus OrderID(37): in an F/G it names the captured run's venue order, which this
+# run doesn't have; 41 (remapped below) is enough for the venue to find ours
+SKIP_TAGS = {"8", "9", "10", "34", "35", "37", "43", "49", "50", "52", "56", "57", "97", "115", "116",
+             "122", "128", "129", "142", "143", "144", "145", "1128", "1129"}
+ACKS = {"D": "8/0", "F": "8/4", "G": "8/5"}
+
+_SPLIT = re.compile(r"[\x01|]")
+
+
+def iter_log_messages(path, msg_types=("D", "F", "G")):
+    """(sending_time_ns, msgtype, [(tag, value), ...]) per message of msg_types, in log order."""
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            i = line.find("8=FIX")
+            if i < 0 or "35=" not in line:
+                continue
+            fields = []
+            for fld in _SPLIT.split(line[i:].rstrip("\r\n")):
+                tag, eq, val = fld.partition("=")
+                if eq and tag.isdigit():
+                    fields.append((tag, val))
+            hdr = dict(fields[:12])    # 35 and 52 sit in the first few fields
+            mt, ts = hdr.get("35"), hdr.get("52")
+            if mt not in msg_types or not ts:
+                continue
+            try:
+                t = sending_time_ns(ts)
+            except ValueError:
+                continue
+            yield t, mt, fields
+
+
+def replay_offsets(path, msg_types, speed, limit=None):
+    """Send offsets (ns from start) from the captured 52s; speed=None -> all zero (asap).
+
+    The times come from iter_log_messages, so there is exactly one offset per
+    message the replay will stream; order_scheduler.replay_arrivals turns them
+    into offsets the same way as the simplerepeat replay profile.
+    """
+    times = [t for t, _, _ in islice(iter_log_messages(path, msg_types), limit)]
+    if speed is None:
+        return array("q", bytes(8 * len(times)))
+    return replay_arrivals(path, speed=speed, times=times)
+
+
+class Replayer:
+    """Rewrites captured messages for this run and sends them through a FIXLatencyTester.App."""
+
+    def __init__(self, app: "flt.App"):
+        self.app = app
+        self.idmap = {}          # captured 11 -> our new 11, so later F/G find their order
+        self.tags = {mt: app.lat.add_tag(f"{mt} -> {ack}") for mt, ack in ACKS.items()}
+        self.sent = dict.fromkeys(ACKS, 0)
+        self.unmapped_orig = 0   # F/G whose 41 was sent before the capture started
+        self.refused = 0         # not sent: the in-flight window was full
+
+    def build(self, mt, fields, clid):
+        msg = fix.Message()
+        msg.getHeader().setField(fix.MsgType(mt))
+        for tag, val in fields:
+            if tag in SKIP_TAGS:
+                continue
+            if tag == "11":
+                val = clid
+            elif tag == "41":
+                new = self.idmap.get(val)
+                if new is None:
+                    self.unmapped_orig += 1
+                else:
+                    val = new
+            elif tag == "60":
+                msg.setField(fix.TransactTime())
+                continue
+            msg.setField(int(tag), val)
+        return msg
+
+    def send(self, mt, fields, intended_ns=None):
+        app = self.app
+        clid = app.clgen.next_id()
+        # map the captured 11 first: even if this one is never sent, later F/G must not
+        # go out with the captured 41
+        for tag, val in fields:
+            if tag == "11":
+                self.idmap[val] = clid
+                break
+        if app.window and not app.window.acquire():
+            self.refused += 1
+            return False
+        app.lat.note_intended(clid, intended_ns, self.tags[mt])
+        msg = self.build(mt, fields, clid)
+        if app.throttle:
+            app.throttle.acquire()
+        ok = fix.Session.sendToTarget(msg, app.session_id)
+        if ok:
+            self.sent[mt] += 1
+        else:
+            app.lat.discard(clid)
+        app.rplog.write(f"[REPLAY] 35={mt} 11={clid} -> {ok}")
+        return ok
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Replay 35=D/F/G from a QuickFIX messages log.")
+    ap.add_argument("config", help="initiator cfg for the session to replay on")
+    ap.add_argument("log", help="FileLog messages log, e.g. store/FIXT.1.1-4C001-ForecastEx.messages.current.log")
+    pace = ap.add_mutually_exclusive_group()
+    pace.add_argument("--speed", type=float, default=1.0, help="1 = captured pace, 2 = twice as fast, 0.5 = half")
+    pace.add_argument("--asap", action="store_true", help="ignore captured timing, send back to back")
+    ap.add_argument("--types", default="D,F,G", help="message types to replay (comma list)")
+    ap.add_argument("--limit", type=int, help="replay at most this many messages")
+    ap.add_argument("--logon-timeout", type=float, default=10.0)
+    ap.add_argument("--drain-secs", type=float, default=10.0, help="max wait for acks after the last send")
+    args = ap.parse_args()
+
+    types = tuple(t.strip().upper() for t in args.types.split(",") if t.strip())
+    if not set(types) <= set(ACKS):
+        sys.exit(f"--types must be from {','.join(ACKS)}")
+    if not args.asap and args.speed <= 0:
+        sys.exit("--speed must be > 0")
+    speed = None if args.asap else args.speed
+
+    # timetable first (just the timestamps), then stream the messages in the same order
+    offsets = replay_offsets(args.log, types, speed, args.limit)
+    if not offsets:
+        sys.exit(f"no {'/'.join(types)} messages with a SendingTime(52) in {args.log}")
+    span = offsets[-1] / 1e9
+    print(f"[REPLAY] {len(offsets)} messages from {args.log}; "
+          f"{'asap' if speed is None else f'{span:.3f}s at x{speed:g}'}")
+
+    settings = fix.SessionSettings(args.config)
+    app = flt.App(file_tag=".replay", clordid_prefix=run_prefix("R"))   # own prefix: own counter
+    init = fix.SocketInitiator(app, fix.FileStoreFactory(settings), settings, fix.FileLogFactory(settings))
+    init.start()
+    rep = Replayer(app)
+    try:
+        t0 = time.time()
+        while app.session_id is None and time.time() - t0 < args.logon_timeout:
+            time.sleep(0.05)
+        if app.session_id is None:
+            print(f"ERROR: no logon within {args.logon_timeout}s; nothing sent")
+            return
+
+        stream = iter_log_messages(args.log, types)
+
+        def send_one(i, planned_ns):
+            _, mt, fields = next(stream)
+            # asap has no plan to be late against: raw and corrected are the same
+            rep.send(mt, fields, None if speed is None else planned_ns)
+
+        sched = OpenLoopScheduler(arrivals=offsets)
+        sched.run(send_one)
+        t0 = time.time()
+        while app.lat.summary().get("pending", 0) > 0 and time.time() - t0 < args.drain_secs:
+            time.sleep(0.05)
+
+        print(sched.summary_line(prefix="[SCHED]"))
+        print(f"[REPLAY] sent D={rep.sent['D']} F={rep.sent['F']} G={rep.sent['G']}  "
+              f"41 not from this capture={rep.unmapped_orig}  window refused={rep.refused}")
+    except KeyboardInterrupt:
+        print("[REPLAY] interrupted")
+    finally:
+        print(app.lat.summary_line(prefix="[FINAL]"))
+        for line in app.lat.tag_lines(prefix="[TYPE]"):
+            print(line)
+        init.stop()
+        app.close_logs()
+
+
+if __name__ == "__main__":
+    main()
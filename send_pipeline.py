@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# send_pipeline.py
+# Generator -> sender handoff: SPSC ring buffer plus a dedicated sender thread.
+#
+# The generating thread (scheduler loop) only builds an order spec and drops it
+# in a preallocated ring; one sender thread takes specs out and does the
+# expensive part (template build, sendToTarget, logging). That splits the cost
+# per order into:
+#   gen      time the producer spent building the spec (caller-measured, in ns)
+#   handoff  enqueue -> dequeue, i.e. time spent waiting in the ring
+#   send     the sender's send_fn call
+# and samples the ring depth on every enqueue.
+#
+# The ring has exactly one producer and one consumer, so it needs no lock: the
+# producer writes the slot and only then advances tail, the consumer reads the
+# slot and only then advances head. Each index is written by one thread only.
+# An empty ring makes the sender poll (a few spins, then short sleeps); a full
+# ring makes the producer wait, which is counted.
+import threading, time
+
+from hdr_histogram import LogLinearHistogram
+
+
+class SpscRing:
+    """Fixed-size single-producer / single-consumer ring of (spec, enq_ns, intended_ns)."""
+
+    def __init__(self, capacity=4096):
+        if capacity < 2 or capacity & (capacity - 1):
+            raise ValueError("capacity must be a power of two >= 2")
+        self.capacity = capacity
+        self._mask = capacity - 1
+        self._slots = [None] * capacity
+        self._head = 0      # next slot to read  (consumer only)
+        self._tail = 0      # next slot to write (producer only)
+
+    def __len__(self):
+        return self._tail - self._head
+
+    def try_put(self, item) -> bool:
+        t = self._tail
+        if t - self._head >= self.capacity:
+            return False
+        self._slots[t & self._mask] = item
+        self._tail = t + 1          # publish after the slot is written
+        return True
+
+    def try_get(self):
+        h = self._head
+        if h == self._tail:
+            return None
+        i = h & self._mask
+        item = self._slots[i]
+        self._slots[i] = None
+        self._head = h + 1
+        return item
+
+
+class SendPipeline:
+    """Runs send_fn(spec, intended_ns) on its own thread for specs submit()ted from another."""
+
+    def __init__(self, send_fn, capacity=4096, spin=200, idle_sleep_s=0.00005):
+        self.send_fn = send_fn
+        self.ring = SpscRing(capacity)
+        self.spin = spin                    # empty polls before the sender starts sleeping
+        self.idle_sleep_s = idle_sleep_s
+        self.depth = LogLinearHistogram(highest_us=max(2, capacity))   # ring depth at each enqueue
+        self.gen_ns = LogLinearHistogram(highest_us=60_000_000_000)   # in ns: a spec takes well under 1us
+        self.handoff_us = LogLinearHistogram()
+        self.send_us = LogLinearHistogram()
+        self.submitted = 0
+        self.sent = 0
+        self.full_waits = 0                 # submits that found the ring full
+        self.full_wait_ns = 0
+        self.errors = 0
+        self._stop = False
+        self._thread = threading.Thread(target=self._run, name="fix-sender", daemon=True)
+        self._thread.start()
+
+    # ---- producer side ----
+    def submit(self, spec, intended_ns=None, gen_ns=None):
+        """Queues one spec; blocks while the ring is full. gen_ns = caller's build time, if measured."""
+        now = time.perf_counter_ns
+        ring = self.ring
+        self.depth.record(len(ring))
+        item = (spec, now(), intended_ns)
+        if not ring.try_put(item):
+            self.full_waits += 1
+            t0 = now()
+            while not ring.try_put(item):
+                time.sleep(self.idle_sleep_s)
+            self.full_wait_ns += now() - t0
+        if gen_ns is not None:
+            self.gen_ns.record(gen_ns)
+        self.submitted += 1
+
+    # ---- consumer side ----
+    def _run(self):
+        now = time.perf_counter_ns
+        ring = self.ring
+        idle = 0
+        while True:
+            item = ring.try_get()
+            if item is None:
+                if not self._stop:
+                    idle += 1
+                    if idle > self.spin:
+                        time.sleep(self.idle_sleep_s)
+                    continue
+                # the last submit() may have landed between the empty poll and close()
+                item = ring.try_get()
+                if item is None:
+                    return
+            idle = 0
+            spec, enq_ns, intended_ns = item
+            t0 = now()
+            self.handoff_us.record((t0 - enq_ns) // 1000)
+            try:
+                self.send_fn(spec, intended_ns)
+            except Exception as e:
+                self.errors += 1
+                print(f"[PIPE] send failed: {e}")
+            else:
+                self.sent += 1
+            self.send_us.record((now() - t0) // 1000)
+
+    def close(self, timeout=30.0):
+        """Lets the sender drain what is queued, then stops it. False if it did not finish in time."""
+        self._stop = True
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            print(f"[PIPE] WARNING: sender still busy after {timeout:g}s; "
+                  f"{self.unsent} submitted specs not sent yet")
+            return False
+        return True
+
+    # ---- report ----
+    @property
+    def unsent(self):
+        """Submitted specs the sender has not got to (failed sends count as errors, not here)."""
+        return self.submitted - self.sent - self.errors
+
+    @staticmethod
+    def _p(h, unit="us"):
+        p = h.percentiles((50, 99))
+        return f"p50={p[50]}{unit} p99={p[99]}{unit} max={h.max}{unit}"
+
+    def summary_line(self, prefix="[PIPE]"):
+        d = self.depth.percentiles((50, 99))
+        return (f"{prefix} submitted={self.submitted} sent={self.sent} unsent={self.unsent} "
+                f"errors={self.errors}  "
+                f"depth mean={self.depth.mean:.1f} p50={d[50]} p99={d[99]} max={self.depth.max}  "
+                f"full={self.full_waits} ({self.full_wait_ns / 1e6:.1f}ms)\n"
+                f"{prefix} gen {self._p(self.gen_ns, 'ns')}  handoff {self._p(self.handoff_us)}  "
+                f"send {self._p(self.send_us)}")
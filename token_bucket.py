@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# token_bucket.py
+# Token-bucket send throttle for venue message-rate limits.
+#
+# The bucket fills at `rate` tokens/sec up to `burst`; every app-level message
+# (NOS, cancel, replace, MD request) takes one token before sendToTarget. With
+# tokens to spare a send goes straight out; otherwise the caller books its
+# token (the count goes negative) and waits until the refill covers it, so
+# concurrent senders queue in order and the long-run rate never exceeds `rate`.
+# Waiting is sleep-then-spin, like the scheduler, and all of it is counted as
+# time spent throttled.
+import threading, time
+
+NS = 1_000_000_000
+
+
+class TokenBucket:
+    """rate msgs/sec sustained, up to burst back-to-back; acquire() blocks when empty."""
+
+    def __init__(self, rate, burst=1, spin_us=200):
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+        if burst < 1:
+            raise ValueError("burst must be >= 1")
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.spin_ns = int(spin_us * 1000)
+        self._lock = threading.Lock()
+        self._tokens = self.burst            # start full
+        self._last_ns = time.perf_counter_ns()
+        self.acquired = 0
+        self.throttled = 0                   # acquires that had to wait
+        self.throttled_ns = 0
+        self.max_wait_ns = 0
+
+    def _refill(self, now_ns):
+        # called with _lock held
+        self._tokens = min(self.burst, self._tokens + (now_ns - self._last_ns) * self.rate / NS)
+        self._last_ns = now_ns
+
+    def try_acquire(self, n=1) -> bool:
+        """Takes n tokens if they are there right now; never waits."""
+        with self._lock:
+            self._refill(time.perf_counter_ns())
+            if self._tokens < n:
+                return False
+            self._tokens -= n
+            self.acquired += n
+            return True
+
+    def acquire(self, n=1) -> int:
+        """Takes n tokens, waiting for the refill if needed; returns ns waited."""
+        with self._lock:
+            now = time.perf_counter_ns()
+            self._refill(now)
+            self._tokens -= n
+            self.acquired += n
+            if self._tokens >= 0:
+                return 0
+            # book the tokens now, leave once the refill has paid them back
+            deadline = now + int(-self._tokens * NS / self.rate)
+            self.throttled += 1
+        wait = deadline - time.perf_counter_ns()
+        if wait > self.spin_ns:
+            time.sleep((wait - self.spin_ns) / NS)
+        while time.perf_counter_ns() < deadline:
+            pass
+        waited = time.perf_counter_ns() - now
+        with self._lock:
+            self.throttled_ns += waited
+            if waited > self.max_wait_ns:
+                self.max_wait_ns = waited
+        return waited
+
+    def summary(self):
+        return {"rate": self.rate, "burst": self.burst, "acquired": self.acquired,
+                "throttled": self.throttled, "throttled_ms": self.throttled_ns / 1e6,
+                "max_wait_ms": self.max_wait_ns / 1e6}
+
+    def summary_line(self, prefix="[THROTTLE]"):
+        s = self.summary()
+        return (f"{prefix} rate={s['rate']:g}/s burst={s['burst']:g} msgs={s['acquired']} "
+                f"throttled={s['throttled']} ({s['throttled_ms']:.1f}ms total, "
+                f"max wait {s['max_wait_ms']:.2f}ms)")
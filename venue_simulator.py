@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+# venue_simulator.py
+# Local ForecastEx stand-in: a QuickFIX acceptor in front of matching_engine.py.
+#
+# Benchmarks against UAT (18.232.15.202) mix our own overhead with venue and
+# network noise and can't run offline. This acceptor speaks the part of the
+# venue our senders use - FIXT.1.1 / FIX50SP2 (1137=9), 762 YES/NO, 581/582,
+# DAY/GTC limit orders - and answers from an in-memory price-time book:
+#   35=D  -> 8 150=0 (new), then 150=F per fill (both sides), or 150=8 (reject)
+#   35=F  -> 8 150=4 (canceled) or 35=9 (434=1)
+#   35=G  -> 8 150=5 (replaced), fills if the new price crosses, or 35=9 (434=2)
+# YES buy at p crosses NO buy at 1 - p, so crossed YES/NO orders fill here the
+# way they would on the venue. Every outgoing app message can be held back by
+# --latency-us (+ up to --jitter-us) to stand in for venue processing time; 0
+# sends straight from the QuickFIX callback.
+#
+# --faults / --fault-script inject venue failures (see fault_injection.py):
+# dropped ERs, latency spikes, 35=3 rejects, forced logouts, sequence gaps.
+# The summary then also reports how long each session was down, and how many
+# messages were resent after ResendRequests and how fast.
+#
+#   python3 venue_simulator.py config/acceptor_sim.cfg --latency-us 250 --jitter-us 50
+#   python3 venue_simulator.py config/acceptor_sim.cfg --faults drop=0.01,logout_after=5000,gap=0.001
+#   python3 MasterSendOrders.RPVersion.py config/sendOrderLocal.cfg saturate
+import argparse, queue, random, threading, time
+
+import quickfix as fix
+import quickfix50sp2 as fix50sp2
+
+from fault_injection import FaultPlan, load_script, parse_settings
+from matching_engine import MatchingEngine
+from price_ladder import tick_str, to_tick
+
+NS = 1_000_000_000
+_TIFS = {"0", "1"}        # DAY, GTC
+
+
+class Outbox:
+    """Sends the venue's app messages after the injected delay, in order, from one thread."""
+
+    def __init__(self, latency_us=0, jitter_us=0, seed=None, spin_us=200, threaded=False):
+        self.latency_ns = int(latency_us * 1000)
+        self.jitter_ns = int(jitter_us * 1000)
+        self.spin_ns = int(spin_us * 1000)
+        self._rng = random.Random(seed)
+        self._last_due = 0
+        self.sent = 0
+        self.failed = 0
+        self._q = None
+        self._thread = None
+        if self.latency_ns or self.jitter_ns or threaded:
+            self._q = queue.Queue()
+            self._thread = threading.Thread(target=self._run, name="sim-outbox", daemon=True)
+            self._thread.start()
+
+    def put(self, msg, sid, extra_ns=0):
+        if self._q is None:
+            self._send(msg, sid)
+            return
+        due = time.perf_counter_ns() + self.latency_ns + extra_ns
+        if self.jitter_ns:
+            due += int(self._rng.random() * self.jitter_ns)
+        # jitter never reorders: an ER can't overtake the one before it
+        if due < self._last_due:
+            due = self._last_due
+        self._last_due = due
+        self._q.put((due, msg, sid))
+
+    def _send(self, msg, sid):
+        if fix.Session.sendToTarget(msg, sid):
+            self.sent += 1
+        else:
+            self.failed += 1
+
+    def _run(self):
+        now_ns = time.perf_counter_ns
+        while True:
+            item = self._q.get()
+            if item is None:
+                return
+            due, msg, sid = item
+            wait = due - now_ns()
+            if wait > self.spin_ns:
+                time.sleep((wait - self.spin_ns) / NS)
+            while now_ns() < due:
+                pass
+            self._send(msg, sid)
+
+    def close(self):
+        if self._q is not None:
+            self._q.put(None)
+            self._thread.join(5.0)
+
+    def summary_line(self, prefix="[OUTBOX]"):
+        pending = self._q.qsize() if self._q is not None else 0
+        return (f"{prefix} sent={self.sent} failed={self.failed} queued={pending}  "
+                f"latency={self.latency_ns / 1000:.0f}us +jitter<={self.jitter_ns / 1000:.0f}us")
+
+
+def _get(msg, tag):
+    return msg.getField(tag) if msg.isSetField(tag) else None
+
+
+class SimApp(fix.Application):
+    def __init__(self, engine: MatchingEngine, outbox: Outbox, faults: FaultPlan = None):
+        super().__init__()
+        self.engine = engine
+        self.outbox = outbox
+        self.faults = faults or FaultPlan()
+        self._lock = threading.Lock()   # one engine for all sessions
+        self._exec_seq = 0
+        self.rejects = 0
+        self.cancel_rejects = 0
+        self.ignored = 0
+        # session health, keyed by str(sid)
+        self._app_msgs = {}             # app messages since logon (for logout_after)
+        self._forced = set()            # sessions we logged out; re-enabled on onLogout
+        self._down_since = {}
+        self.downtimes_ns = []          # logout -> next logon, per reconnect
+        self.resend_requests = 0
+        self.resent = 0
+        self._resend_ns = 0             # sum over ResendRequests of request -> last resent message
+        self._burst = None              # [request_ns, last_resent_ns] of the latest ResendRequest
+
+    # lifecycle
+    def onCreate(self, sid): pass
+
+    def onLogon(self, sid):
+        key = sid.toString()
+        self._app_msgs[key] = 0
+        down = self._down_since.pop(key, None)
+        note = ""
+        if down is not None:
+            self.downtimes_ns.append(time.perf_counter_ns() - down)
+            note = f" (down {self.downtimes_ns[-1] / 1e9:.3f}s)"
+        print(f"[SIM] logon  {sid} at {time.strftime('%H:%M:%S', time.gmtime())} UTC{note}")
+
+    def onLogout(self, sid):
+        key = sid.toString()
+        self._down_since[key] = time.perf_counter_ns()
+        print(f"[SIM] logout {sid}")
+        print(self.engine.summary_line())
+        if key in self._forced:
+            # Session.logout() also disables the session; let the initiator back in
+            self._forced.discard(key)
+            fix.Session.lookupSession(sid).logon()
+
+    def toAdmin(self, msg, sid): pass
+
+    def fromAdmin(self, msg, sid):
+        if msg.getHeader().getField(35) == fix.MsgType_ResendRequest:
+            self._close_burst()
+            self.resend_requests += 1
+            now = time.perf_counter_ns()
+            self._burst = [now, now]
+
+    def toApp(self, msg, sid):
+        # called again for every app message QuickFIX resends, with PossDupFlag(43)=Y
+        if _get(msg.getHeader(), 43) == "Y":
+            self.resent += 1
+            if self._burst is not None:
+                self._burst[1] = time.perf_counter_ns()
+
+    def _close_burst(self):
+        if self._burst is not None:
+            self._resend_ns += self._burst[1] - self._burst[0]
+            self._burst = None
+
+    def fromApp(self, msg, sid):
+        mt = msg.getHeader().getField(35)
+        sub_id = _get(msg.getHeader(), 50)
+        key = sid.toString()
+        with self._lock:
+            if self.faults.reject_now():
+                self._session_reject(msg, mt, sid, sub_id)
+            elif mt == fix.MsgType_NewOrderSingle:
+                self.on_new_order(msg, sid, sub_id)
+            elif mt == fix.MsgType_OrderCancelRequest:
+                self.on_cancel(msg, sid, sub_id)
+            elif mt == fix.MsgType_OrderCancelReplaceRequest:
+                self.on_replace(msg, sid, sub_id)
+            else:
+                self.ignored += 1
+            n = self._app_msgs.get(key, 0) + 1
+            if self.faults.logout_now(n):
+                n = 0
+                self._forced.add(key)
+                fix.Session.lookupSession(sid).logout(f"simulated logout after {self.faults.logout_after} messages")
+            self._app_msgs[key] = n
+
+    # ---- inbound ----
+    @staticmethod
+    def _order_fields(msg):
+        """(tick, qty, tif) from a D/G; ValueError with the reject text if the venue would refuse it."""
+        for tag, name in ((55, "Symbol"), (762, "SecuritySubType"), (44, "Price"), (38, "OrderQty"),
+                          (581, "AccountType"), (582, "CustOrderCapacity")):
+            if not msg.isSetField(tag):
+                raise ValueError(f"missing {name}({tag})")
+        if _get(msg, 40) != fix.OrdType_LIMIT:
+            raise ValueError("only limit orders (40=2)")
+        tif = _get(msg, 59) or fix.TimeInForce_DAY
+        if tif not in _TIFS:
+            raise ValueError(f"unsupported TimeInForce(59)={tif}")
+        px = msg.getField(44)
+        try:
+            tick = to_tick(px)
+        except ArithmeticError:      # decimal.InvalidOperation
+            raise ValueError(f"bad Price(44)={px}") from None
+        if abs(float(px) * 100 - tick) > 1e-6:
+            raise ValueError(f"price {px} not on a 0.01 tick")
+        qty = float(msg.getField(38))
+        if qty != int(qty):
+            raise ValueError(f"OrderQty(38)={qty} not whole contracts")
+        return tick, int(qty), tif
+
+    def on_new_order(self, msg, sid, sub_id):
+        try:
+            tick, qty, tif = self._order_fields(msg)
+            o = self.engine.new_order(
+                msg.getField(11), msg.getField(55), msg.getField(762), msg.getField(54) == fix.Side_BUY,
+                tick, qty, _get(msg, 1), tif, owner=(sid, sub_id))
+        except ValueError as e:
+            self.rejects += 1
+            self._send(self._reject_report(msg, str(e)), sid, sub_id)
+            return
+        self._send(self._exec_report(o, fix.ExecType_NEW, fix.OrdStatus_NEW), sid, sub_id)
+        self._send_fills(self.engine.match(o))
+
+    def on_cancel(self, msg, sid, sub_id):
+        orig = _get(msg, 41)
+        o = self.engine.cancel(orig) if orig else None
+        if o is None:
+            self.cancel_rejects += 1
+            self._send(self._cancel_reject(msg, "1", "unknown order"), sid, sub_id)
+            return
+        self._send(self._exec_report(o, fix.ExecType_CANCELED, fix.OrdStatus_CANCELED,
+                                     clordid=msg.getField(11), orig=orig), sid, sub_id)
+
+    def on_replace(self, msg, sid, sub_id):
+        orig = _get(msg, 41)
+        try:
+            tick, qty, _ = self._order_fields(msg)
+            o = self.engine.replace(orig, msg.getField(11), tick, qty) if orig else None
+        except ValueError as e:
+            self.cancel_rejects += 1
+            self._send(self._cancel_reject(msg, "2", str(e)), sid, sub_id)
+            return
+        if o is None:
+            self.cancel_rejects += 1
+            self._send(self._cancel_reject(msg, "2", "unknown order"), sid, sub_id)
+            return
+        self._send(self._exec_report(o, fix.ExecType_REPLACED, self._status(o), orig=orig), sid, sub_id)
+        self._send_fills(self.engine.match(o))
+
+    # ---- outbound ----
+    def _send(self, msg, sid, sub_id):
+        faults = self.faults
+        if faults.drop_now():
+            return
+        if sub_id:
+            msg.getHeader().setField(fix.TargetSubID(sub_id))          # 57 <- their 50
+        skip = faults.gap_now()
+        if skip:
+            s = fix.Session.lookupSession(sid)
+            s.setNextSenderMsgSeqNum(s.getExpectedSenderNum() + skip)
+        self.outbox.put(msg, sid, faults.spike_ns())
+
+    def _session_reject(self, msg, mt, sid, sub_id):
+        rj = fix.Message()
+        rj.getHeader().setField(fix.MsgType(fix.MsgType_Reject))          # 35=3
+        if sub_id:
+            rj.getHeader().setField(fix.TargetSubID(sub_id))           # 57
+        rj.setField(fix.RefSeqNum(int(msg.getHeader().getField(34))))    # 45
+        rj.setField(fix.RefMsgType(mt))                                 # 372
+        rj.setField(fix.SessionRejectReason(fix.SessionRejectReason_OTHER))   # 373=99
+        rj.setField(fix.Text("simulated reject"))                       # 58
+        self.outbox.put(rj, sid)
+
+    def _send_fills(self, fills):
+        for f in fills:
+            for o in (f.aggressor, f.resting):
+                sid, sub_id = o.owner
+                self._send(self._exec_report(o, fix.ExecType_TRADE, self._status(o),
+                                             last_qty=f.qty, last_tick=o.own_tick(f.ytick)), sid, sub_id)
+
+    @staticmethod
+    def _status(o):
+        if o.leaves == 0 and o.cum:
+            return fix.OrdStatus_FILLED
+        return fix.OrdStatus_PARTIALLY_FILLED if o.cum else fix.OrdStatus_NEW
+
+    def _exec_id(self):
+        self._exec_seq += 1
+        return f"E{self._exec_seq}"
+
+    def _exec_report(self, o, exectype, ordstatus, last_qty=0, last_tick=0, clordid=None, orig=None):
+        er = fix50sp2.ExecutionReport()
+        er.setField(fix.OrderID(o.order_id))                                # 37
+        er.setField(fix.ExecID(self._exec_id()))                            # 17
+        er.setField(fix.ClOrdID(clordid or o.clordid))                      # 11
+        if orig: er.setField(fix.OrigClOrdID(orig))                         # 41
+        er.setField(fix.ExecType(exectype))                                 # 150
+        er.setField(fix.OrdStatus(ordstatus))                               # 39
+        if o.account: er.setField(fix.Account(o.account))                   # 1
+        er.setField(fix.Symbol(o.symbol))                                   # 55
+        er.setField(fix.Side(fix.Side_BUY if o.buy else fix.Side_SELL))     # 54
+        er.setField(fix.OrdType(fix.OrdType_LIMIT))                         # 40
+        er.setField(fix.OrderQty(o.qty))                                    # 38
+        er.setField(44, tick_str(o.tick))                                   # 44
+        er.setField(fix.SecuritySubType(o.sec_subtype))                     # 762
+        er.setField(fix.TimeInForce(o.tif))                                 # 59
+        er.setField(fix.LeavesQty(o.leaves))                                # 151
+        er.setField(fix.CumQty(o.cum))                                      # 14
+        er.setField(fix.AvgPx(round(o.avg_tick / 100, 6)))                  # 6
+        if last_qty:
+            er.setField(fix.LastQty(last_qty))                              # 32
+            er.setField(31, tick_str(last_tick))                            # 31
+        er.setField(fix.TransactTime())                                     # 60
+        return er
+
+    def _reject_report(self, msg, text):
+        er = fix50sp2.ExecutionReport()
+        er.setField(fix.OrderID("NONE"))                                    # 37
+        er.setField(fix.ExecID(self._exec_id()))                            # 17
+        er.setField(fix.ClOrdID(_get(msg, 11) or "NONE"))                   # 11
+        er.setField(fix.ExecType(fix.ExecType_REJECTED))                    # 150=8
+        er.setField(fix.OrdStatus(fix.OrdStatus_REJECTED))                  # 39=8
+        er.setField(fix.OrdRejReason(fix.OrdRejReason_OTHER))               # 103=99
+        for tag in (1, 55, 54, 38, 44, 762):
+            v = _get(msg, tag)
+            if v is not None:
+                er.setField(tag, v)
+        er.setField(fix.LeavesQty(0))                                       # 151
+        er.setField(fix.CumQty(0))                                          # 14
+        er.setField(fix.AvgPx(0))                                           # 6
+        er.setField(fix.Text(text))                                         # 58
+        er.setField(fix.TransactTime())                                     # 60
+        return er
+
+    @staticmethod
+    def _cancel_reject(msg, response_to, text):
+        cr = fix50sp2.OrderCancelReject()
+        cr.setField(fix.OrderID(_get(msg, 37) or "NONE"))                   # 37
+        cr.setField(fix.ClOrdID(_get(msg, 11) or "NONE"))                   # 11
+        cr.setField(fix.OrigClOrdID(_get(msg, 41) or "NONE"))               # 41
+        cr.setField(fix.OrdStatus(fix.OrdStatus_REJECTED))                  # 39=8
+        cr.setField(fix.CxlRejResponseTo(response_to))                      # 434: 1=F, 2=G
+        cr.setField(fix.CxlRejReason(fix.CxlRejReason_UNKNOWN_ORDER if text == "unknown order"
+                                     else fix.CxlRejReason_OTHER))          # 102
+        cr.setField(fix.Text(text))                                         # 58
+        return cr
+
+    def summary_line(self, prefix="[SIM]"):
+        return (f"{prefix} rejects(8/8)={self.rejects} cancel-rejects(35=9)={self.cancel_rejects} "
+                f"ignored={self.ignored}")
+
+    def session_line(self, prefix="[SIM]"):
+        self._close_burst()
+        d = sorted(self.downtimes_ns)
+        down = (f"reconnects={len(d)} down p50={d[len(d) // 2] / 1e9:.3f}s max={d[-1] / 1e9:.3f}s"
+                if d else "reconnects=0")
+        rate = f" ({self.resent * 1e9 / self._resend_ns:.0f} msg/s)" if self._resend_ns else ""
+        return f"{prefix} {down}  resend requests={self.resend_requests} resent={self.resent}{rate}"
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Local ForecastEx stand-in (acceptor + matching engine)")
+    ap.add_argument("config", help="acceptor cfg, e.g. config/acceptor_sim.cfg")
+    ap.add_argument("--latency-us", type=float, default=0.0, help="delay added to every outgoing app message")
+    ap.add_argument("--jitter-us", type=float, default=0.0, help="plus a uniform 0..jitter on top")
+    ap.add_argument("--seed", type=int, help="jitter / fault seed")
+    ap.add_argument("--faults", default="",
+                    help="fault settings, e.g. drop=0.01,spike=0.001,spike_us=50000,reject=0.005,"
+                         "logout_after=5000,gap=0.001,gap_size=5")
+    ap.add_argument("--fault-script", help="file of '<at_s> key=val ...' lines changing the faults over the run")
+    ap.add_argument("--stats-every", type=float, default=10.0, help="print engine stats every N seconds (0 = off)")
+    ap.add_argument("--file-log", action="store_true",
+                    help="write QuickFIX message/event logs (FileLogPath); off by default so logging isn't measured")
+    args = ap.parse_args()
+
+    try:
+        faults = FaultPlan(args.seed, load_script(args.fault_script) if args.fault_script else None,
+                           **parse_settings(args.faults))
+    except (OSError, ValueError) as e:
+        ap.error(str(e))
+
+    settings = fix.SessionSettings(args.config)
+    engine = MatchingEngine()
+    outbox = Outbox(args.latency_us, args.jitter_us, args.seed, threaded=faults.may_delay)
+    app = SimApp(engine, outbox, faults)
+    # messages kept in memory so resend requests can be served without disk I/O
+    store = fix.MemoryStoreFactory()
+    if args.file_log:
+        acceptor = fix.SocketAcceptor(app, store, settings, fix.FileLogFactory(settings))
+    else:
+        acceptor = fix.SocketAcceptor(app, store, settings)
+    acceptor.start()
+    faults.start()
+    print(f"[SIM] listening ({args.config}); latency={args.latency_us:g}us jitter={args.jitter_us:g}us"
+          f"{'  faults on' if faults.active else ''}. Ctrl+C to stop.")
+    try:
+        last = time.time()
+        while True:
+            time.sleep(0.1)
+            faults.tick()
+            if args.stats_every and time.time() - last >= args.stats_every:
+                last = time.time()
+                print(engine.summary_line())
+                if faults.active:
+                    print(faults.summary_line())
+    except KeyboardInterrupt:
+        print("\n[SIM] stopping")
+    finally:
+        acceptor.stop()
+        outbox.close()
+        print(engine.summary_line())
+        print(app.summary_line())
+        print(app.session_line())
+        if faults.active:
+            print(faults.summary_line())
+        print(outbox.summary_line())
+
+
+if __name__ == "__main__":
+    main()